@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being scored"""
+
+    def __init__(self, reason: str, status_code: int = 503, retry_after: Optional[int] = 1):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded wait queue for the scoring endpoints.
+
+    At most ``max_concurrency`` requests are scored at once and at most
+    ``max_queue`` wait for a slot; anything beyond that is rejected
+    immediately. Waiting requests give up after ``queue_timeout`` seconds or
+    when their own deadline passes, whichever comes first.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 32, queue_timeout: float = 2.0,
+                 retry_after: int = 1):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_queue_timeout = 0
+        self.dropped_expired = 0
+
+    async def acquire(self, deadline: Optional[float] = None):
+        """Wait for a scoring slot or raise AdmissionRejected"""
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            self.shed_queue_full += 1
+            raise AdmissionRejected("Server busy: prediction queue full", retry_after=self.retry_after)
+
+        timeout = self.queue_timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            self.dropped_expired += 1
+            raise AdmissionRejected("Request deadline already expired", status_code=504, retry_after=None)
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            if deadline is not None and time.monotonic() >= deadline:
+                self.dropped_expired += 1
+                raise AdmissionRejected("Request deadline expired while queued", status_code=504,
+                                        retry_after=None)
+            self.shed_queue_timeout += 1
+            raise AdmissionRejected("Server busy: timed out waiting for capacity", retry_after=self.retry_after)
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'queue_timeout_seconds': self.queue_timeout,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queued,
+            'admitted': self.admitted,
+            'shed_queue_full': self.shed_queue_full,
+            'shed_queue_timeout': self.shed_queue_timeout,
+            'dropped_expired': self.dropped_expired
+        }
@@ -0,0 +1,184 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prediction_audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    model_version TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    hearing_loss TEXT,
+    hearing_loss_type TEXT,
+    hearing_loss_severity TEXT,
+    confidence_scores TEXT,
+    latency_ms REAL,
+    request TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prediction_audit_timestamp ON prediction_audit (timestamp);
+CREATE INDEX IF NOT EXISTS idx_prediction_audit_model_version ON prediction_audit (model_version, timestamp);
+"""
+
+INSERT_SQL = """
+INSERT INTO prediction_audit (timestamp, model_version, variant, hearing_loss, hearing_loss_type,
+                              hearing_loss_severity, confidence_scores, latency_ms, request)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class PredictionAuditStore:
+    """Embedded SQLite (WAL) audit log fed by a bounded queue.
+
+    ``record()`` never blocks the request path: entries are queued and a
+    background writer commits them in batches. When the queue is full the
+    entry is dropped and counted instead.
+    """
+
+    def __init__(self, db_path: str = 'prediction_audit.db', queue_size: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 0.5):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._writer = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        self._stop_event.clear()
+        self._writer = threading.Thread(target=self._run_writer, name='audit-writer', daemon=True)
+        self._writer.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush remaining entries and stop the writer thread"""
+        self._stop_event.set()
+        if self._writer is not None:
+            self._writer.join(timeout)
+            self._writer = None
+
+    def record(self, model_version: str, variant: str, request: dict, prediction: dict,
+               latency_ms: Optional[float] = None) -> bool:
+        """Queue a prediction for auditing; returns False if it was dropped"""
+        row = (
+            time.time(),
+            model_version,
+            variant,
+            prediction.get('hearing_loss'),
+            prediction.get('hearing_loss_type'),
+            prediction.get('hearing_loss_severity'),
+            json.dumps(prediction.get('confidence_scores', {})),
+            latency_ms,
+            json.dumps(request, default=str)
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _run_writer(self):
+        conn = self._connect()
+        try:
+            while not (self._stop_event.is_set() and self._queue.empty()):
+                batch = self._drain_batch()
+                if batch:
+                    self._write_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _drain_batch(self) -> List[tuple]:
+        """Collect up to batch_size rows, waiting at most flush_interval"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]):
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, batch)
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+        except sqlite3.Error as e:
+            logger.error(f"Audit write failed for {len(batch)} entries: {e}")
+            with self._lock:
+                self.write_errors += len(batch)
+
+    def recent(self, limit: int = 50, model_version: Optional[str] = None,
+               since: Optional[float] = None) -> List[Dict]:
+        """Most recent audited predictions, newest first"""
+        clauses, params = [], []
+        if model_version:
+            clauses.append('model_version = ?')
+            params.append(model_version)
+        if since is not None:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                f"SELECT * FROM prediction_audit {where} ORDER BY timestamp DESC LIMIT ?", params
+            ).fetchall()
+        finally:
+            conn.close()
+
+        results = []
+        for row in rows:
+            entry = dict(row)
+            entry['confidence_scores'] = json.loads(entry['confidence_scores'] or '{}')
+            entry['request'] = json.loads(entry['request'])
+            results.append(entry)
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'db_path': self.db_path,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'written': self.written,
+                'batches': self.batches,
+                'write_errors': self.write_errors,
+                'writer_running': self._writer is not None and self._writer.is_alive()
+            }
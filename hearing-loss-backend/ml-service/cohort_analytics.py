@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from features import perform_feature_engineering
+
+AGE_BAND_EDGES = [0, 18, 40, 65, 121]
+AGE_BAND_LABELS = ['0-17', '18-39', '40-64', '65+']
+PTA_BIN_EDGES = list(range(-10, 130, 10))
+PTA_BIN_LABELS = [f'{lo}-{hi}' for lo, hi in zip(PTA_BIN_EDGES[:-1], PTA_BIN_EDGES[1:])]
+
+
+def age_band(age: float) -> str:
+    return AGE_BAND_LABELS[min(int(np.searchsorted(AGE_BAND_EDGES, age, side='right')) - 1,
+                               len(AGE_BAND_LABELS) - 1)]
+
+
+def pta_bin(pta: float) -> str:
+    index = int(np.searchsorted(PTA_BIN_EDGES, pta, side='right')) - 1
+    return PTA_BIN_LABELS[min(max(index, 0), len(PTA_BIN_LABELS) - 1)]
+
+
+def empty_summary() -> Dict:
+    return {
+        'patients': 0,
+        'type_by_age_band': {},
+        'severity_by_age_band': {},
+        'pta_histogram': {'left': {}, 'right': {}, 'worse': {}},
+        'tympanogram_mix': {'left': {}, 'right': {}}
+    }
+
+
+def _nested_counts(series: pd.Series) -> Dict:
+    """{outer: {inner: count}} from a two-level group-by size series"""
+    nested = {}
+    for (outer, inner), count in series.items():
+        if count:
+            nested.setdefault(str(outer), {})[str(inner)] = int(count)
+    return nested
+
+
+def summarize_frame(df: pd.DataFrame) -> Dict:
+    """Cohort aggregates of a labeled dataset, computed with vectorized group-bys"""
+    df = perform_feature_engineering(df.copy())
+    bands = pd.cut(df['age'], bins=AGE_BAND_EDGES, labels=AGE_BAND_LABELS, right=False)
+
+    def histogram(values: pd.Series) -> Dict:
+        bins = pd.cut(values.clip(PTA_BIN_EDGES[0], PTA_BIN_EDGES[-1] - 1e-9),
+                      bins=PTA_BIN_EDGES, labels=PTA_BIN_LABELS, right=False)
+        return {str(k): int(v) for k, v in bins.value_counts(sort=False).items() if v}
+
+    return {
+        'patients': int(len(df)),
+        'type_by_age_band': _nested_counts(df.groupby([bands, df['hearing_loss_type']], observed=True).size()),
+        'severity_by_age_band': _nested_counts(
+            df.groupby([bands, df['hearing_loss_severity']], observed=True).size()),
+        'pta_histogram': {
+            'left': histogram(df['pta_l']),
+            'right': histogram(df['pta_r']),
+            'worse': histogram(df['pta_worse'])
+        },
+        'tympanogram_mix': {
+            'left': {str(k): int(v) for k, v in df['tymp_type_l'].value_counts().items()},
+            'right': {str(k): int(v) for k, v in df['tymp_type_r'].value_counts().items()}
+        }
+    }
+
+
+class CohortAnalytics:
+    """Materialized cohort summaries for the training data and scored predictions.
+
+    Training aggregates are computed once; scored aggregates are updated in
+    place per prediction. The JSON payload is only rebuilt when the version
+    changes, and the version doubles as the ETag.
+    """
+
+    def __init__(self, training_summary: Dict, scored_summary: Optional[Dict] = None):
+        self._lock = threading.Lock()
+        self._generation = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._cached_payload = None
+        self._cached_version = None
+        self.training = training_summary
+        self.scored = scored_summary or empty_summary()
+
+    @classmethod
+    def from_files(cls, data_path: str, scored_path: Optional[str] = None) -> 'CohortAnalytics':
+        training_summary = summarize_frame(pd.read_csv(data_path))
+        scored_summary = None
+        if scored_path and os.path.exists(scored_path):
+            with open(scored_path) as f:
+                scored_summary = json.load(f)
+        return cls(training_summary, scored_summary)
+
+    def add_prediction(self, age: float, pta_l: float, pta_r: float, tymp_type_l: str, tymp_type_r: str,
+                       prediction: Dict):
+        """Incrementally fold one scored prediction into the scored summary"""
+        band = age_band(age)
+        with self._lock:
+            summary = self.scored
+            summary['patients'] += 1
+            for key, target in [('type_by_age_band', 'hearing_loss_type'),
+                                ('severity_by_age_band', 'hearing_loss_severity')]:
+                counts = summary[key].setdefault(band, {})
+                counts[prediction[target]] = counts.get(prediction[target], 0) + 1
+            for side, pta in [('left', pta_l), ('right', pta_r), ('worse', max(pta_l, pta_r))]:
+                histogram = summary['pta_histogram'][side]
+                histogram[pta_bin(pta)] = histogram.get(pta_bin(pta), 0) + 1
+            for side, tymp in [('left', tymp_type_l), ('right', tymp_type_r)]:
+                mix = summary['tympanogram_mix'][side]
+                mix[tymp] = mix.get(tymp, 0) + 1
+            self._version += 1
+
+    def snapshot(self) -> Tuple[str, Dict]:
+        """(ETag, JSON-ready payload); the payload is rebuilt only after new predictions"""
+        with self._lock:
+            if self._cached_version != self._version:
+                self._cached_payload = json.loads(json.dumps({
+                    'version': self._version,
+                    'age_bands': AGE_BAND_LABELS,
+                    'pta_bins': PTA_BIN_LABELS,
+                    'training': self.training,
+                    'scored': self.scored
+                }))
+                self._cached_version = self._version
+            return f'"{self._generation}-{self._version}"', self._cached_payload
+
+    def save_scored(self, scored_path: str):
+        with self._lock:
+            with open(scored_path, 'w') as f:
+                json.dump(self.scored, f)
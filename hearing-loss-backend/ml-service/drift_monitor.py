@@ -0,0 +1,120 @@
+import random
+import threading
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Raw audiometric thresholds and the engineered features derived from them
+MONITORED_PREFIXES = ('ac_', 'bc_', 'srt_', 'wrs_', 'pta_', 'abg_', 'hf_avg_')
+
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def monitored_features(columns: List[str]) -> List[str]:
+    """Numeric model features tracked for input drift"""
+    return [col for col in columns if col.startswith(MONITORED_PREFIXES)]
+
+
+def build_reference_profile(df: pd.DataFrame, features: List[str], n_bins: int = 10) -> Dict:
+    """Quantile bin edges and bin counts of the training data for each feature"""
+    profile = {}
+    for feature in features:
+        values = df[feature].to_numpy(dtype=float)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        profile[feature] = {'edges': edges, 'counts': counts}
+    return profile
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray, eps: float = 1e-4) -> float:
+    expected_pct = np.clip(expected / max(expected.sum(), 1), eps, None)
+    actual_pct = np.clip(actual / max(actual.sum(), 1), eps, None)
+    return float(np.sum((actual_pct - expected_pct) * np.log(actual_pct / expected_pct)))
+
+
+def binned_ks_statistic(expected: np.ndarray, actual: np.ndarray) -> float:
+    """KS statistic evaluated on the shared bin edges"""
+    expected_cdf = np.cumsum(expected) / max(expected.sum(), 1)
+    actual_cdf = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(expected_cdf - actual_cdf)))
+
+
+class DriftMonitor:
+    """Constant-memory streaming histograms compared against a training profile.
+
+    Each feature keeps a fixed-size count array over the reference bin
+    edges, so an update is one ``searchsorted`` per feature regardless of
+    how many predictions have been served. Features are only flagged once
+    ``min_observations`` rows have been seen, since PSI on a handful of rows
+    is meaningless.
+    """
+
+    def __init__(self, reference_profile: Dict, sample_rate: float = 1.0, min_observations: int = 300):
+        self.reference = reference_profile
+        self.features = list(reference_profile.keys())
+        self.sample_rate = sample_rate
+        self.min_observations = min_observations
+        self._lock = threading.Lock()
+        self._counts = {}
+        self.observed = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = {
+                feature: np.zeros(len(ref['counts']), dtype=np.int64)
+                for feature, ref in self.reference.items()
+            }
+            self.observed = 0
+
+    def update(self, data_df: pd.DataFrame):
+        """Add engineered feature rows to the live histograms (subject to sampling)"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        bin_indices = {}
+        for feature in self.features:
+            if feature in data_df.columns:
+                values = data_df[feature].to_numpy(dtype=float)
+                bin_indices[feature] = np.searchsorted(self.reference[feature]['edges'], values, side='right')
+        with self._lock:
+            for feature, indices in bin_indices.items():
+                np.add.at(self._counts[feature], indices, 1)
+            self.observed += len(data_df)
+
+    def report(self) -> Dict:
+        """PSI and KS drift scores per feature"""
+        with self._lock:
+            counts = {feature: arr.copy() for feature, arr in self._counts.items()}
+            observed = self.observed
+
+        features = {}
+        for feature, actual in counts.items():
+            expected = self.reference[feature]['counts']
+            if actual.sum() == 0:
+                features[feature] = {'psi': None, 'ks': None, 'status': 'no_data'}
+                continue
+            psi = population_stability_index(expected, actual)
+            if observed < self.min_observations:
+                status = 'insufficient_data'
+            elif psi >= PSI_SIGNIFICANT:
+                status = 'significant'
+            elif psi >= PSI_MODERATE:
+                status = 'moderate'
+            else:
+                status = 'stable'
+            features[feature] = {
+                'psi': round(psi, 4),
+                'ks': round(binned_ks_statistic(expected, actual), 4),
+                'status': status
+            }
+
+        return {
+            'status': 'insufficient_data' if observed < self.min_observations else 'ok',
+            'observed': observed,
+            'min_observations': self.min_observations,
+            'sample_rate': self.sample_rate,
+            'drifted_features': sorted(f for f, r in features.items() if r['status'] == 'significant'),
+            'features': features
+        }
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+TARGET_NAMES = ['hearing_loss', 'hearing_loss_type', 'hearing_loss_severity']
+
+
+def request_hash(data_dict: dict, variant: str, top_k: int) -> str:
+    """Stable hash of a prediction request used as the explanation cache key"""
+    payload = json.dumps(data_dict, sort_keys=True, default=str)
+    return hashlib.sha256(f"{variant}|{top_k}|{payload}".encode()).hexdigest()
+
+
+class ExplanationCache:
+    """Thread-safe LRU cache of per-request explanations"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def _decode_label(target: str, class_index: int, label_encoders: dict) -> str:
+    if target == 'hearing_loss':
+        return "Yes" if class_index == 1 else "No"
+    return str(label_encoders[target].classes_[class_index])
+
+
+def explain_batch(model, label_encoders: dict, model_input: pd.DataFrame, top_k: int = 5) -> List[Dict]:
+    """Top-K TreeSHAP feature contributions per target for every row of model_input.
+
+    Contributions come from XGBoost's native ``pred_contribs`` output and are
+    computed for the whole batch at once. For multi-class targets the
+    contributions towards the predicted class are reported.
+    """
+    columns = np.array(model_input.columns)
+    values = model_input.to_numpy(dtype=float)
+    dmatrix = xgb.DMatrix(model_input.astype(float), feature_names=list(columns))
+    n_rows = len(model_input)
+    row_index = np.arange(n_rows)
+    top_k = max(1, min(top_k, len(columns)))
+
+    explanations = [dict() for _ in range(n_rows)]
+    for target, estimator in zip(TARGET_NAMES, model.estimators_):
+        contribs = estimator.get_booster().predict(dmatrix, pred_contribs=True)
+        probabilities = estimator.predict_proba(model_input)
+        predicted = np.argmax(probabilities, axis=1)
+
+        # Binary targets return (rows, features + 1); multi-class targets
+        # return (rows, classes, features + 1)
+        if contribs.ndim == 3:
+            contribs = contribs[row_index, predicted, :]
+        else:
+            # Binary contributions push towards the positive class; flip them
+            # so they explain the predicted class
+            contribs = np.where((predicted == 1)[:, None], contribs, -contribs)
+
+        feature_contribs = contribs[:, :-1]
+        base_values = contribs[:, -1]
+        top_indices = np.argsort(-np.abs(feature_contribs), axis=1)[:, :top_k]
+        top_contribs = np.take_along_axis(feature_contribs, top_indices, axis=1)
+        top_values = np.take_along_axis(values, top_indices, axis=1)
+
+        for i in range(n_rows):
+            explanations[i][target] = {
+                'predicted': _decode_label(target, int(predicted[i]), label_encoders),
+                'base_value': float(base_values[i]),
+                'top_features': [
+                    {
+                        'feature': str(columns[j]),
+                        'value': float(v),
+                        'contribution': float(c)
+                    }
+                    for j, v, c in zip(top_indices[i], top_values[i], top_contribs[i])
+                ]
+            }
+
+    return explanations
@@ -0,0 +1,49 @@
+import pandas as pd
+import numpy as np
+
+
+def perform_feature_engineering(data_df: pd.DataFrame) -> pd.DataFrame:
+    """Perform EXACT feature engineering as in training script"""
+
+    # Air-Bone Gap (ABG) features
+    for freq in [500, 1000, 2000, 4000]:
+        data_df[f'abg_l_{freq}'] = data_df[f'ac_l_{freq}'] - data_df[f'bc_l_{freq}']
+        data_df[f'abg_r_{freq}'] = data_df[f'ac_r_{freq}'] - data_df[f'bc_r_{freq}']
+
+    # Pure Tone Averages (PTA)
+    data_df['pta_l'] = (data_df['ac_l_500'] + data_df['ac_l_1000'] +
+                        data_df['ac_l_2000'] + data_df['ac_l_4000']) / 4
+    data_df['pta_r'] = (data_df['ac_r_500'] + data_df['ac_r_1000'] +
+                        data_df['ac_r_2000'] + data_df['ac_r_4000']) / 4
+    data_df['pta_better'] = np.minimum(data_df['pta_l'], data_df['pta_r'])
+    data_df['pta_worse'] = np.maximum(data_df['pta_l'], data_df['pta_r'])
+    data_df['pta_asymmetry'] = np.abs(data_df['pta_l'] - data_df['pta_r'])
+
+    # High-frequency averages
+    data_df['hf_avg_l'] = (data_df['ac_l_4000'] + data_df['ac_l_8000']) / 2
+    data_df['hf_avg_r'] = (data_df['ac_r_4000'] + data_df['ac_r_8000']) / 2
+
+    # Speech-audiometry derived features
+    data_df['srt_pta_diff_l'] = data_df['srt_l'] - data_df['pta_l']
+    data_df['srt_pta_diff_r'] = data_df['srt_r'] - data_df['pta_r']
+
+    # ABG averages
+    data_df['abg_avg_l'] = (data_df['abg_l_500'] + data_df['abg_l_1000'] +
+                            data_df['abg_l_2000'] + data_df['abg_l_4000']) / 4
+    data_df['abg_avg_r'] = (data_df['abg_r_500'] + data_df['abg_r_1000'] +
+                            data_df['abg_r_2000'] + data_df['abg_r_4000']) / 4
+
+    # Bilateral features
+    data_df['bilateral_loss'] = ((data_df['pta_l'] > 25) & (data_df['pta_r'] > 25)).astype(int)
+    data_df['unilateral_loss'] = (((data_df['pta_l'] > 25) & (data_df['pta_r'] <= 25)) |
+                                  ((data_df['pta_r'] > 25) & (data_df['pta_l'] <= 25))).astype(int)
+
+    return data_df
+
+def build_feature_frame(records: list) -> pd.DataFrame:
+    """Convert request dicts into the engineered, one-hot encoded feature frame"""
+    data_df = pd.DataFrame(records)
+    data_df = perform_feature_engineering(data_df)
+
+    categorical_input_cols = ['tymp_type_l', 'tymp_type_r']
+    return pd.get_dummies(data_df, columns=categorical_input_cols, drop_first=False)
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+
+def count_trees(booster: xgb.Booster) -> int:
+    """Number of trees stored in a booster"""
+    model = json.loads(booster.save_raw('json'))
+    return len(model['learner']['gradient_booster']['model']['trees'])
+
+
+class JointLabelClassifier:
+    """Single XGBoost booster over the joint (binary, type, severity) label space.
+
+    Every observed combination of the three encoded targets becomes one
+    class, and XGBoost's ``multi_output_tree`` strategy grows one tree per
+    boosting round with a vector leaf across all classes (instead of one
+    tree per class per target). Per-target probabilities are the marginals
+    of the joint distribution, so ``predict``/``predict_proba`` match the
+    MultiOutputClassifier interface used by the server.
+    """
+
+    def __init__(self, **xgb_params):
+        self.xgb_params = dict(xgb_params, tree_method='hist', multi_strategy='multi_output_tree')
+        self.booster_ = None
+        self.combinations_ = None
+        self.target_classes_ = None
+
+    def fit(self, X: pd.DataFrame, y: pd.DataFrame):
+        y_values = np.asarray(y, dtype=int)
+        self.target_classes_ = [np.unique(y_values[:, t]) for t in range(y_values.shape[1])]
+        self.combinations_, joint_labels = np.unique(y_values, axis=0, return_inverse=True)
+        self.booster_ = xgb.XGBClassifier(**self.xgb_params)
+        self.booster_.fit(X, joint_labels.ravel())
+        return self
+
+    def joint_proba(self, X: pd.DataFrame) -> np.ndarray:
+        return self.booster_.predict_proba(X)
+
+    def predict_proba(self, X: pd.DataFrame) -> list:
+        """Marginal class probabilities per target, one (n_samples, n_classes) array each"""
+        joint = self.joint_proba(X)
+        marginals = []
+        for t, classes in enumerate(self.target_classes_):
+            # Column c of the marginal sums the joint classes whose target t equals classes[c]
+            membership = (self.combinations_[:, t][:, None] == classes[None, :]).astype(float)
+            marginals.append(joint @ membership)
+        return marginals
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        marginals = self.predict_proba(X)
+        return np.column_stack([
+            classes[np.argmax(proba, axis=1)] for classes, proba in zip(self.target_classes_, marginals)
+        ])
+
+    @property
+    def n_trees(self) -> int:
+        return count_trees(self.booster_.get_booster())
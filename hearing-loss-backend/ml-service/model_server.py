@@ -1,10 +1,30 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, Header
+from fastapi.responses import JSONResponse, Response, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
+from typing import Optional, Dict, List, Any, Annotated
 import pandas as pd
 import numpy as np
 import joblib
+import json
 import logging
+import math
+import os
+import time
+import hashlib
+import hmac
+
+from features import build_feature_frame
+from explainer import ExplanationCache, explain_batch, request_hash
+from audit_store import PredictionAuditStore
+from drift_monitor import DriftMonitor
+from admission_control import AdmissionController, AdmissionRejected
+from shadow_scoring import ShadowScorer
+from similar_cases import SimilarCaseIndex
+from streaming_session import AudiometrySession
+from cohort_analytics import CohortAnalytics
+from profiling import OnDemandProfiler
+from request_metrics import RequestMetrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -68,6 +88,13 @@ class PredictionRequest(BaseModel):
     abr_wave_v_latency: Optional[float] = Field(0.0, ge=0, le=10, description="ABR Wave V latency (ms)")
     abr_wave_v_absent: Optional[int] = Field(0, ge=0, le=1, description="ABR Wave V absent")
 
+    @field_validator('oae_500_present', 'oae_1000_present', 'oae_4000_present', 'abr_wave_i_latency',
+                     'abr_wave_iii_latency', 'abr_wave_v_latency', 'abr_wave_v_absent', mode='before')
+    @classmethod
+    def default_missing_optional(cls, value, info):
+        # An explicit null means "not measured": use the default instead of passing None to the model
+        return cls.model_fields[info.field_name].default if value is None else value
+
 class PredictionResponse(BaseModel):
     hearing_loss: str
     hearing_loss_type: str
@@ -75,12 +102,42 @@ class PredictionResponse(BaseModel):
     confidence_scores: dict
     clinical_summary: dict
 
+class BatchPredictionResult(BaseModel):
+    status_code: int
+    prediction: Optional[PredictionResponse] = None
+    detail: Optional[List[dict]] = None
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionResult]
+
+class SimilarCasesResponse(BaseModel):
+    neighbors: List[dict]
+
+class BatchSimilarCasesResponse(BaseModel):
+    results: List[SimilarCasesResponse]
+
+class ExplanationResponse(BaseModel):
+    cached: bool
+    explanations: dict
+
+class BatchExplanationResponse(BaseModel):
+    results: List[ExplanationResponse]
+
 # --- Load Model Artifacts ---
-def load_model_artifacts():
+# Model variants produced by train_model.py ("compact" requires --compact,
+# "joint" requires --joint)
+MODEL_VARIANT_FILES = {
+    'full': 'hearing_loss_model.pkl',
+    'compact': 'hearing_loss_model_compact.pkl',
+    'joint': 'hearing_loss_model_joint.pkl'
+}
+DEFAULT_MODEL_VARIANT = os.getenv('MODEL_VARIANT', 'full')
+
+def load_model_artifacts(model_filename: str = 'hearing_loss_model.pkl'):
     """Load all required model artifacts with error handling"""
     try:
         # Try to load the comprehensive model artifacts first
-        model_artifacts = joblib.load('hearing_loss_model.pkl')
+        model_artifacts = joblib.load(model_filename)
         if isinstance(model_artifacts, dict) and 'model' in model_artifacts:
             model = model_artifacts['model']
             label_encoders = model_artifacts.get('label_encoders', {})
@@ -110,6 +167,41 @@ def load_model_artifacts():
 # Load model artifacts on startup
 model, label_encoders, feature_info, model_columns = load_model_artifacts()
 
+# Optional alternative variants, selectable per request or via MODEL_VARIANT
+model_variants = {'full': (model, label_encoders, feature_info, model_columns)}
+for variant_name, variant_file in MODEL_VARIANT_FILES.items():
+    if variant_name != 'full' and os.path.exists(variant_file):
+        variant_artifacts = load_model_artifacts(variant_file)
+        if variant_artifacts[0] is not None:
+            model_variants[variant_name] = variant_artifacts
+
+# Per-request explanations are cached by request hash
+EXPLAIN_TOP_K = int(os.getenv('EXPLAIN_TOP_K', '5'))
+explanation_cache = ExplanationCache(max_size=int(os.getenv('EXPLAIN_CACHE_SIZE', '1024')))
+
+def artifact_version(model_filename: str) -> str:
+    """Short content hash identifying a model artifact file"""
+    try:
+        with open(model_filename, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:12]
+    except OSError:
+        return 'unknown'
+
+model_versions = {name: artifact_version(MODEL_VARIANT_FILES[name]) for name in model_variants}
+
+def get_model_variant(variant: Optional[str] = None):
+    """Return (model, label_encoders, model_columns) for the requested variant"""
+    variant = variant or DEFAULT_MODEL_VARIANT
+    if variant not in MODEL_VARIANT_FILES:
+        raise HTTPException(status_code=400, detail=f"Unknown model variant '{variant}'")
+    if variant not in model_variants:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model variant '{variant}' not available. Run train_model.py --{variant} to create it."
+        )
+    variant_model, variant_encoders, _, variant_columns = model_variants[variant]
+    return variant_model, variant_encoders, variant_columns
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Hearing Loss Prediction API",
@@ -117,43 +209,158 @@ app = FastAPI(
     version="2.0.0"
 )
 
-def perform_feature_engineering(data_df: pd.DataFrame) -> pd.DataFrame:
-    """Perform EXACT feature engineering as in training script"""
+# Every prediction is retained for audit by a background writer
+AUDIT_ENABLED = os.getenv('AUDIT_ENABLED', 'true').lower() == 'true'
+audit_store = PredictionAuditStore(
+    db_path=os.getenv('AUDIT_DB_PATH', 'prediction_audit.db'),
+    queue_size=int(os.getenv('AUDIT_QUEUE_SIZE', '10000')),
+    batch_size=int(os.getenv('AUDIT_BATCH_SIZE', '200')),
+    flush_interval=float(os.getenv('AUDIT_FLUSH_INTERVAL', '0.5'))
+) if AUDIT_ENABLED else None
+
+# Streaming input-drift monitor against the training reference profile
+def load_drift_monitor():
+    try:
+        reference_profile = joblib.load('drift_reference.pkl')
+    except FileNotFoundError:
+        logger.warning("drift_reference.pkl not found; drift monitoring disabled. Re-run train_model.py.")
+        return None
+    return DriftMonitor(reference_profile, sample_rate=float(os.getenv('DRIFT_SAMPLE_RATE', '1.0')),
+                        min_observations=int(os.getenv('DRIFT_MIN_OBSERVATIONS', '300')))
+
+drift_monitor = load_drift_monitor()
+
+# Admission control for the scoring endpoints: bounded concurrency and
+# wait queue, fast 503 rejection beyond that
+ADMISSION_CONTROLLED_PATHS = {'/predict', '/predict/batch', '/explain', '/explain/batch'}
+admission_controller = AdmissionController(
+    max_concurrency=int(os.getenv('MAX_CONCURRENT_PREDICTIONS', '8')),
+    max_queue=int(os.getenv('MAX_QUEUED_PREDICTIONS', '32')),
+    queue_timeout=float(os.getenv('PREDICTION_QUEUE_TIMEOUT', '2.0'))
+)
+
+# Latency and batch-size metrics for the scoring endpoints
+request_metrics = RequestMetrics(window=int(os.getenv('METRICS_WINDOW', '1000')))
+PREDICT_BATCH_MAX_SIZE = int(os.getenv('PREDICT_BATCH_MAX_SIZE', '256'))
 
-    # Air-Bone Gap (ABG) features
-    for freq in [500, 1000, 2000, 4000]:
-        data_df[f'abg_l_{freq}'] = data_df[f'ac_l_{freq}'] - data_df[f'bc_l_{freq}']
-        data_df[f'abg_r_{freq}'] = data_df[f'ac_r_{freq}'] - data_df[f'bc_r_{freq}']
+# On-demand sampling profiler; idle unless started via /admin/profile/start
+profiler = OnDemandProfiler()
 
-    # Pure Tone Averages (PTA)
-    data_df['pta_l'] = (data_df['ac_l_500'] + data_df['ac_l_1000'] +
-                        data_df['ac_l_2000'] + data_df['ac_l_4000']) / 4
-    data_df['pta_r'] = (data_df['ac_r_500'] + data_df['ac_r_1000'] +
-                        data_df['ac_r_2000'] + data_df['ac_r_4000']) / 4
-    data_df['pta_better'] = np.minimum(data_df['pta_l'], data_df['pta_r'])
-    data_df['pta_worse'] = np.maximum(data_df['pta_l'], data_df['pta_r'])
-    data_df['pta_asymmetry'] = np.abs(data_df['pta_l'] - data_df['pta_r'])
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    if request.url.path not in ADMISSION_CONTROLLED_PATHS:
+        return await call_next(request)
+    start_time = time.perf_counter()
+    try:
+        # Validation and serialization run on the event loop thread
+        with profiler.track_thread():
+            response = await admitted_call(request, call_next)
+    finally:
+        # Shed and rejected requests must not use up a ?requests=N session
+        if profiler.active and getattr(request.state, 'admitted', False):
+            profiler.request_finished()
+    if getattr(request.state, 'admitted', False):
+        request_metrics.record_request(request.url.path, response.status_code,
+                                       (time.perf_counter() - start_time) * 1000)
+    elif not getattr(request.state, 'invalid_request', False):
+        # Bad client input is not load shedding; only shed/expired requests count here
+        request_metrics.record_rejected(request.url.path)
+    return response
+
+async def admitted_call(request: Request, call_next):
+    # Callers may send their remaining time budget so stale work is dropped
+    deadline = None
+    timeout_header = request.headers.get('X-Request-Timeout-Ms')
+    if timeout_header:
+        try:
+            timeout_ms = float(timeout_header)
+        except ValueError:
+            timeout_ms = None
+        # nan would silently disable the deadline, so only finite budgets are accepted
+        if timeout_ms is None or not math.isfinite(timeout_ms) or timeout_ms < 0:
+            request.state.invalid_request = True
+            return JSONResponse(status_code=400, content={"detail": "Invalid X-Request-Timeout-Ms header"})
+        deadline = time.monotonic() + timeout_ms / 1000
 
-    # High-frequency averages
-    data_df['hf_avg_l'] = (data_df['ac_l_4000'] + data_df['ac_l_8000']) / 2
-    data_df['hf_avg_r'] = (data_df['ac_r_4000'] + data_df['ac_r_8000']) / 2
+    try:
+        await admission_controller.acquire(deadline)
+    except AdmissionRejected as e:
+        headers = {'Retry-After': str(e.retry_after)} if e.retry_after else None
+        return JSONResponse(status_code=e.status_code, content={"detail": e.reason}, headers=headers)
 
-    # Speech-audiometry derived features
-    data_df['srt_pta_diff_l'] = data_df['srt_l'] - data_df['pta_l']
-    data_df['srt_pta_diff_r'] = data_df['srt_r'] - data_df['pta_r']
+    try:
+        if deadline is not None and time.monotonic() >= deadline:
+            admission_controller.dropped_expired += 1
+            return JSONResponse(status_code=504, content={"detail": "Request deadline expired while queued"})
+        request.state.admitted = True
+        return await call_next(request)
+    finally:
+        admission_controller.release()
+
+# Optional candidate model scored on mirrored traffic off the hot path
+def load_shadow_scorer():
+    shadow_path = os.getenv('SHADOW_MODEL_PATH')
+    if not shadow_path:
+        return None
+    shadow_model, shadow_encoders, _, shadow_columns = load_model_artifacts(shadow_path)
+    if shadow_model is None:
+        logger.error(f"Shadow model '{shadow_path}' could not be loaded; shadow scoring disabled")
+        return None
+    logger.info(f"Shadow scoring enabled with candidate '{shadow_path}'")
+    return ShadowScorer(
+        shadow_model, shadow_encoders, shadow_columns,
+        version=artifact_version(shadow_path),
+        sample_rate=float(os.getenv('SHADOW_SAMPLE_RATE', '1.0')),
+        queue_size=int(os.getenv('SHADOW_QUEUE_SIZE', '1000')),
+        workers=int(os.getenv('SHADOW_WORKERS', '2'))
+    )
+
+shadow_scorer = load_shadow_scorer()
+
+# Nearest prior cases, from a persisted index over the dataset audiograms
+SIMILAR_CASES_TOP_K = int(os.getenv('SIMILAR_CASES_TOP_K', '5'))
+
+def load_similar_case_index():
+    try:
+        return SimilarCaseIndex.load_or_build(
+            os.getenv('SIMILAR_CASES_INDEX', 'similar_case_index.pkl'),
+            os.getenv('SIMILAR_CASES_DATA', 'synthetic_hearing_loss_data.csv')
+        )
+    except Exception as e:
+        logger.error(f"Similar-case index unavailable: {e}")
+        return None
 
-    # ABG averages
-    data_df['abg_avg_l'] = (data_df['abg_l_500'] + data_df['abg_l_1000'] +
-                            data_df['abg_l_2000'] + data_df['abg_l_4000']) / 4
-    data_df['abg_avg_r'] = (data_df['abg_r_500'] + data_df['abg_r_1000'] +
-                            data_df['abg_r_2000'] + data_df['abg_r_4000']) / 4
+similar_case_index = load_similar_case_index()
 
-    # Bilateral features
-    data_df['bilateral_loss'] = ((data_df['pta_l'] > 25) & (data_df['pta_r'] > 25)).astype(int)
-    data_df['unilateral_loss'] = (((data_df['pta_l'] > 25) & (data_df['pta_r'] <= 25)) |
-                                  ((data_df['pta_r'] > 25) & (data_df['pta_l'] <= 25))).astype(int)
+# Materialized cohort aggregates for the AnalysisPage
+ANALYTICS_SCORED_PATH = os.getenv('ANALYTICS_SCORED_PATH', 'cohort_analytics_scored.json')
 
-    return data_df
+def load_cohort_analytics():
+    try:
+        return CohortAnalytics.from_files(
+            os.getenv('ANALYTICS_DATA', 'synthetic_hearing_loss_data.csv'), ANALYTICS_SCORED_PATH
+        )
+    except Exception as e:
+        logger.error(f"Cohort analytics unavailable: {e}")
+        return None
+
+cohort_analytics = load_cohort_analytics()
+
+@app.on_event("startup")
+def start_background_workers():
+    if audit_store is not None:
+        audit_store.start()
+    if shadow_scorer is not None:
+        shadow_scorer.start()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    if audit_store is not None:
+        audit_store.stop()
+    if shadow_scorer is not None:
+        shadow_scorer.stop()
+    if cohort_analytics is not None:
+        cohort_analytics.save_scored(ANALYTICS_SCORED_PATH)
 
 def generate_clinical_summary(data_df: pd.DataFrame, prediction_result: dict) -> dict:
     """Generate clinical insights from the audiological data"""
@@ -219,11 +426,87 @@ def health_check():
         "status": "healthy" if model is not None else "unhealthy",
         "model_loaded": model is not None,
         "encoders_loaded": label_encoders is not None,
-        "feature_count": len(model_columns) if model_columns else 0
+        "feature_count": len(model_columns) if model_columns else 0,
+        "default_variant": DEFAULT_MODEL_VARIANT,
+        "available_variants": sorted(model_variants.keys())
     }
 
+def score_feature_frames(data_df: pd.DataFrame, variant_model, variant_encoders: dict, variant_columns: list):
+    """Score every row of an engineered feature frame with one model call.
+
+    Returns a list of (predictions, confidences, clinical summary) per row
+    and the model latency of the whole call.
+    """
+
+    # 4. Ensure all model columns are present (reindex to match training)
+    model_input = data_df.reindex(columns=variant_columns, fill_value=0)
+
+    logger.info(f"Feature engineering complete. Shape: {model_input.shape}")
+
+    # 5. Make prediction
+    model_start_time = time.perf_counter()
+    prediction_numeric = variant_model.predict(model_input)
+    prediction_proba = variant_model.predict_proba(model_input)
+    model_latency_ms = (time.perf_counter() - model_start_time) * 1000
+
+    # 6. Decode predictions (the encoded target variables in one call each)
+    loss_types = variant_encoders['hearing_loss_type'].inverse_transform(prediction_numeric[:, 1])
+    loss_severities = variant_encoders['hearing_loss_severity'].inverse_transform(prediction_numeric[:, 2])
+
+    rows = []
+    for i in range(len(model_input)):
+        prediction_result = {
+            'hearing_loss': "Yes" if prediction_numeric[i][0] == 1 else "No",
+            'hearing_loss_type': loss_types[i],
+            'hearing_loss_severity': loss_severities[i]
+        }
+
+        # 7. Calculate confidence scores
+        confidence_scores = {
+            'hearing_loss': float(np.max(prediction_proba[0][i])),
+            'hearing_loss_type': float(np.max(prediction_proba[1][i])),
+            'hearing_loss_severity': float(np.max(prediction_proba[2][i]))
+        }
+
+        # 8. Generate clinical summary
+        clinical_summary = generate_clinical_summary(data_df.iloc[[i]], prediction_result)
+        rows.append((prediction_result, confidence_scores, clinical_summary))
+
+    return rows, model_latency_ms
+
+def score_feature_frame(data_df: pd.DataFrame, variant_model, variant_encoders: dict, variant_columns: list):
+    """Score a one-row feature frame; returns predictions, confidences, summary and model latency"""
+    rows, model_latency_ms = score_feature_frames(data_df, variant_model, variant_encoders, variant_columns)
+    return (*rows[0], model_latency_ms)
+
+def record_prediction(variant: str, data_dict: dict, data_df: pd.DataFrame, prediction_result: dict,
+                      confidence_scores: dict, model_latency_ms: float, latency_ms: float):
+    """Audit, shadow-score and aggregate a served prediction (never blocks the response)"""
+
+    # 9. Queue the prediction for audit
+    if audit_store is not None:
+        audit_store.record(
+            model_version=model_versions[variant],
+            variant=variant,
+            request=data_dict,
+            prediction=dict(prediction_result, confidence_scores=confidence_scores),
+            latency_ms=latency_ms
+        )
+
+    # 10. Mirror to the shadow candidate model
+    if shadow_scorer is not None:
+        shadow_scorer.submit(data_df, prediction_result, model_latency_ms)
+
+    # 11. Fold into the scored cohort aggregates
+    if cohort_analytics is not None:
+        cohort_analytics.add_prediction(
+            data_dict['age'], data_df['pta_l'].iloc[0], data_df['pta_r'].iloc[0],
+            data_dict['tymp_type_l'], data_dict['tymp_type_r'], prediction_result
+        )
+
 @app.post("/predict", response_model=PredictionResponse)
-def predict(request_data: PredictionRequest):
+@profiler.track
+def predict(request_data: PredictionRequest, variant: Optional[str] = None):
     """Predict hearing loss using comprehensive audiological assessment"""
 
     # Check if model is loaded
@@ -233,66 +516,393 @@ def predict(request_data: PredictionRequest):
             detail="Model not loaded. Please check server logs and ensure training files are available."
         )
 
+    variant_model, variant_encoders, variant_columns = get_model_variant(variant)
+    variant = variant or DEFAULT_MODEL_VARIANT
+    start_time = time.perf_counter()
+
     try:
         # 1. Convert request to DataFrame
         data_dict = request_data.model_dump()
-        data_df = pd.DataFrame([data_dict])
 
         logger.info(f"Processing prediction request for patient age {data_dict['age']}")
 
-        # 2. Perform EXACT feature engineering as in training
-        data_df = perform_feature_engineering(data_df)
+        # 2-3. Perform EXACT feature engineering as in training and one-hot
+        # encode the categorical variables
+        data_df = build_feature_frame([data_dict])
+        if drift_monitor is not None:
+            drift_monitor.update(data_df)
 
-        # 3. Handle categorical variables with one-hot encoding
-        categorical_input_cols = ['tymp_type_l', 'tymp_type_r']
-        data_df = pd.get_dummies(data_df, columns=categorical_input_cols, drop_first=False)
+        # 4-8. Predict, decode, score confidence and summarize
+        prediction_result, confidence_scores, clinical_summary, model_latency_ms = score_feature_frame(
+            data_df, variant_model, variant_encoders, variant_columns
+        )
 
-        # 4. Ensure all model columns are present (reindex to match training)
-        data_df = data_df.reindex(columns=model_columns, fill_value=0)
+        logger.info(f"Prediction complete: {prediction_result['hearing_loss']}, "
+                    f"{prediction_result['hearing_loss_type']}, {prediction_result['hearing_loss_severity']}")
 
-        logger.info(f"Feature engineering complete. Shape: {data_df.shape}")
+        response = PredictionResponse(
+            hearing_loss=prediction_result['hearing_loss'],
+            hearing_loss_type=prediction_result['hearing_loss_type'],
+            hearing_loss_severity=prediction_result['hearing_loss_severity'],
+            confidence_scores=confidence_scores,
+            clinical_summary=clinical_summary
+        )
 
-        # 5. Make prediction
-        prediction_numeric = model.predict(data_df)
-        prediction_proba = model.predict_proba(data_df)
+        # 9-11. Audit, shadow-score and aggregate
+        record_prediction(variant, data_dict, data_df, prediction_result, confidence_scores,
+                          model_latency_ms, (time.perf_counter() - start_time) * 1000)
 
-        # 6. Decode predictions
-        hearing_loss_pred = "Yes" if prediction_numeric[0][0] == 1 else "No"
+        # 12. Return comprehensive response
+        return response
 
-        # Handle the encoded target variables
-        loss_type_pred = label_encoders['hearing_loss_type'].inverse_transform([prediction_numeric[0][1]])[0]
-        loss_severity_pred = label_encoders['hearing_loss_severity'].inverse_transform([prediction_numeric[0][2]])[0]
+    except Exception as e:
+        logger.error(f"Prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
-        # 7. Calculate confidence scores
-        confidence_scores = {
-            'hearing_loss': float(np.max(prediction_proba[0])),
-            'hearing_loss_type': float(np.max(prediction_proba[1])),
-            'hearing_loss_severity': float(np.max(prediction_proba[2]))
-        }
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+@profiler.track
+def predict_batch(requests: List[Any], variant: Optional[str] = None):
+    """Predict hearing loss for a batch of assessments with a single model call.
 
-        # 8. Generate clinical summary
-        prediction_result = {
-            'hearing_loss': hearing_loss_pred,
-            'hearing_loss_type': loss_type_pred,
-            'hearing_loss_severity': loss_severity_pred
-        }
+    Records are validated one by one: an invalid record gets its own 422
+    result with the validation errors and the rest of the batch is scored.
+    """
 
-        clinical_summary = generate_clinical_summary(data_df, prediction_result)
+    if model is None or model_columns is None or label_encoders is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Model not loaded. Please check server logs and ensure training files are available."
+        )
+    if len(requests) > PREDICT_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400,
+                            detail=f"Batch size {len(requests)} exceeds the limit of {PREDICT_BATCH_MAX_SIZE}")
+
+    variant_model, variant_encoders, variant_columns = get_model_variant(variant)
+    variant = variant or DEFAULT_MODEL_VARIANT
+    start_time = time.perf_counter()
+
+    results = [None] * len(requests)
+    data_dicts, valid_indices = [], []
+    for i, record in enumerate(requests):
+        try:
+            data_dicts.append(PredictionRequest.model_validate(record).model_dump())
+            valid_indices.append(i)
+        except ValidationError as e:
+            results[i] = BatchPredictionResult(status_code=422, detail=json.loads(e.json(include_url=False)))
+    if not data_dicts:
+        return BatchPredictionResponse(results=results)
 
-        logger.info(f"Prediction complete: {hearing_loss_pred}, {loss_type_pred}, {loss_severity_pred}")
+    try:
+        logger.info(f"Processing batch prediction request of {len(data_dicts)} patients "
+                    f"({len(requests) - len(data_dicts)} invalid)")
+
+        data_df = build_feature_frame(data_dicts)
+        if drift_monitor is not None:
+            drift_monitor.update(data_df)
+
+        rows, model_latency_ms = score_feature_frames(data_df, variant_model, variant_encoders, variant_columns)
+        request_metrics.record_batch(len(rows), model_latency_ms)
+
+        # Audit rows carry the whole batch latency; the shadow model sees per-row model time
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        for i, (prediction_result, confidence_scores, clinical_summary) in enumerate(rows):
+            results[valid_indices[i]] = BatchPredictionResult(status_code=200, prediction=PredictionResponse(
+                hearing_loss=prediction_result['hearing_loss'],
+                hearing_loss_type=prediction_result['hearing_loss_type'],
+                hearing_loss_severity=prediction_result['hearing_loss_severity'],
+                confidence_scores=confidence_scores,
+                clinical_summary=clinical_summary
+            ))
+            record_prediction(variant, data_dicts[i], data_df.iloc[[i]], prediction_result, confidence_scores,
+                              model_latency_ms / len(rows), latency_ms)
+
+        return BatchPredictionResponse(results=results)
 
-        # 9. Return comprehensive response
-        return PredictionResponse(
-            hearing_loss=hearing_loss_pred,
-            hearing_loss_type=loss_type_pred,
-            hearing_loss_severity=loss_severity_pred,
-            confidence_scores=confidence_scores,
-            clinical_summary=clinical_summary
-        )
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+# --- Streaming Audiometry Sessions ---
+# Per-field validators reuse the PredictionRequest constraints
+FIELD_VALIDATORS = {
+    name: TypeAdapter(Annotated[field.annotation, field])
+    for name, field in PredictionRequest.model_fields.items()
+}
+REQUIRED_FIELDS = [name for name, field in PredictionRequest.model_fields.items() if field.is_required()]
+OPTIONAL_DEFAULTS = {
+    name: field.default for name, field in PredictionRequest.model_fields.items() if not field.is_required()
+}
+
+def validate_session_updates(updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate partial field updates against the PredictionRequest field constraints.
+
+    ``null`` clears an optional field back to its default; required fields
+    must carry a value.
+    """
+    unknown = sorted(set(updates) - set(FIELD_VALIDATORS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {unknown}")
+    return {
+        name: OPTIONAL_DEFAULTS[name] if value is None and name in OPTIONAL_DEFAULTS
+        else FIELD_VALIDATORS[name].validate_python(value)
+        for name, value in updates.items()
+    }
+
+def score_session(session: AudiometrySession, variant: str, final: bool) -> dict:
+    """Score a complete session; only the final prediction is audited and aggregated"""
+    variant_model, variant_encoders, variant_columns = get_model_variant(variant)
+    start_time = time.perf_counter()
+    data_df = session.feature_frame()
+    prediction_result, confidence_scores, clinical_summary, model_latency_ms = score_feature_frame(
+        data_df, variant_model, variant_encoders, variant_columns
+    )
+    if final:
+        if drift_monitor is not None:
+            drift_monitor.update(data_df)
+        record_prediction(variant, dict(session.values), data_df, prediction_result, confidence_scores,
+                          model_latency_ms, (time.perf_counter() - start_time) * 1000)
+    return dict(prediction_result, confidence_scores=confidence_scores, clinical_summary=clinical_summary)
+
+@app.websocket("/ws/predict-session")
+async def predict_session(websocket: WebSocket, variant: Optional[str] = None):
+    """Incremental prediction as audiometry is measured.
+
+    Clients send ``{"updates": {"ac_l_2000": 35}}`` messages (or
+    ``{"reset": true}``). Only engineered features depending on the updated
+    fields are recomputed; once every required field is present the session
+    is re-scored and the prediction pushed back. Until then the reply lists
+    the missing fields. Intermediate re-scores are not recorded: a message
+    with ``"final": true`` marks the served prediction, which is then
+    audited, drift-monitored, shadow-scored and added to the analytics. Re-scores go through admission control and get a
+    ``busy`` reply when shed.
+    """
+    await websocket.accept()
+    variant = variant or DEFAULT_MODEL_VARIANT
+    if model is None or variant not in model_variants:
+        await websocket.send_json({"status": "error", "detail": f"Model variant '{variant}' not available"})
+        await websocket.close(code=1011)
+        return
+
+    session = AudiometrySession(REQUIRED_FIELDS, OPTIONAL_DEFAULTS)
+    try:
+        while True:
+            raw_message = await websocket.receive_text()
+            try:
+                message = json.loads(raw_message)
+                if not isinstance(message, dict):
+                    raise ValueError("Message must be a JSON object")
+                if message.get('reset'):
+                    session = AudiometrySession(REQUIRED_FIELDS, OPTIONAL_DEFAULTS)
+                    await websocket.send_json({"status": "reset", "missing_fields": session.missing_fields()})
+                    continue
+                if not isinstance(message.get('updates', {}), dict):
+                    raise ValueError("'updates' must be a JSON object of field values")
+                updates = validate_session_updates(message.get('updates', {}))
+                final = bool(message.get('final'))
+            except (ValueError, ValidationError) as e:
+                await websocket.send_json({"status": "error", "detail": str(e)})
+                continue
+
+            recomputed = session.update(updates)
+            reply = {
+                "updated_fields": sorted(updates),
+                "recomputed_features": recomputed,
+                "missing_fields": session.missing_fields()
+            }
+            if session.is_complete():
+                # Session re-scores share the scoring slots of the HTTP endpoints
+                try:
+                    await admission_controller.acquire()
+                except AdmissionRejected as e:
+                    reply.update(status="busy", detail=e.reason)
+                else:
+                    try:
+                        reply["prediction"] = await run_in_threadpool(score_session, session, variant, final)
+                        reply["status"] = "final" if final else "scored"
+                    except Exception as e:
+                        logger.error(f"Session scoring error: {str(e)}")
+                        reply.update(status="error", detail=f"Prediction failed: {str(e)}")
+                    finally:
+                        admission_controller.release()
+            else:
+                reply["status"] = "incomplete"
+                if final:
+                    reply["detail"] = "Cannot finalize an incomplete session"
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+
+def explain_records(records: List[PredictionRequest], variant: Optional[str], top_k: Optional[int]):
+    """Explain a batch of requests, computing only the cache misses"""
+    if model is None or model_columns is None or label_encoders is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+
+    variant_model, variant_encoders, variant_columns = get_model_variant(variant)
+    if not hasattr(variant_model, 'estimators_'):
+        raise HTTPException(status_code=400,
+                            detail=f"Explanations are not available for the '{variant}' model variant")
+    top_k = EXPLAIN_TOP_K if top_k is None else top_k
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
 
+    data_dicts = [record.model_dump() for record in records]
+    keys = [request_hash(d, variant or DEFAULT_MODEL_VARIANT, top_k) for d in data_dicts]
+    results = [explanation_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    try:
+        if missing:
+            data_df = build_feature_frame([data_dicts[i] for i in missing])
+            model_input = data_df.reindex(columns=variant_columns, fill_value=0)
+            computed = explain_batch(variant_model, variant_encoders, model_input, top_k)
+            for i, explanation in zip(missing, computed):
+                explanation_cache.put(keys[i], explanation)
+                results[i] = explanation
     except Exception as e:
-        logger.error(f"Prediction error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+        logger.error(f"Explanation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
+
+    missing_set = set(missing)
+    return [
+        ExplanationResponse(cached=i not in missing_set, explanations=result)
+        for i, result in enumerate(results)
+    ]
+
+@app.post("/explain", response_model=ExplanationResponse)
+@profiler.track
+def explain(request_data: PredictionRequest, variant: Optional[str] = None, top_k: Optional[int] = None):
+    """Top contributing features per target for a single prediction (TreeSHAP)"""
+    return explain_records([request_data], variant, top_k)[0]
+
+@app.post("/explain/batch", response_model=BatchExplanationResponse)
+@profiler.track
+def explain_batch_endpoint(requests: List[PredictionRequest], variant: Optional[str] = None,
+                           top_k: Optional[int] = None):
+    """Top contributing features per target for a batch of predictions (TreeSHAP)"""
+    return BatchExplanationResponse(results=explain_records(requests, variant, top_k))
+
+def find_similar_cases(records: List[PredictionRequest], top_k: Optional[int]):
+    if similar_case_index is None:
+        raise HTTPException(status_code=503, detail="Similar-case index not available")
+    top_k = SIMILAR_CASES_TOP_K if top_k is None else top_k
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    results = similar_case_index.query([record.model_dump() for record in records], top_k)
+    return [SimilarCasesResponse(neighbors=neighbors) for neighbors in results]
+
+@app.post("/similar", response_model=SimilarCasesResponse)
+def similar_cases(request_data: PredictionRequest, top_k: Optional[int] = None):
+    """Most similar prior patients by normalized audiometric profile"""
+    return find_similar_cases([request_data], top_k)[0]
+
+@app.post("/similar/batch", response_model=BatchSimilarCasesResponse)
+def similar_cases_batch(requests: List[PredictionRequest], top_k: Optional[int] = None):
+    """Most similar prior patients for a batch of audiometric profiles"""
+    return BatchSimilarCasesResponse(results=find_similar_cases(requests, top_k))
+
+@app.get("/explain/cache")
+def explain_cache_stats():
+    """Explanation cache statistics"""
+    return explanation_cache.stats()
+
+@app.get("/audit/recent")
+def audit_recent(limit: int = 50, model_version: Optional[str] = None, since: Optional[float] = None):
+    """Most recent audited predictions, optionally filtered by model version or timestamp"""
+    if audit_store is None:
+        raise HTTPException(status_code=503, detail="Prediction audit is disabled")
+    limit = max(1, min(limit, 1000))
+    return {"predictions": audit_store.recent(limit, model_version, since)}
+
+@app.get("/audit/stats")
+def audit_stats():
+    """Audit queue depth, throughput and drop counters"""
+    if audit_store is None:
+        raise HTTPException(status_code=503, detail="Prediction audit is disabled")
+    return audit_store.stats()
+
+@app.get("/drift")
+def drift_report():
+    """PSI/KS drift scores of served inputs versus the training data, per feature"""
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="Drift monitoring unavailable (no reference profile)")
+    return drift_monitor.report()
+
+@app.post("/drift/reset")
+def drift_reset():
+    """Clear the live drift histograms"""
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="Drift monitoring unavailable (no reference profile)")
+    drift_monitor.reset()
+    return {"status": "reset"}
+
+@app.get("/admission/stats")
+def admission_stats():
+    """Concurrency, queue depth and load-shedding counters"""
+    return admission_controller.stats()
+
+@app.get("/metrics")
+def metrics():
+    """Request counts and latency per scoring endpoint, plus batch sizes for /predict/batch"""
+    return request_metrics.stats()
+
+@app.get("/shadow/stats")
+def shadow_stats():
+    """Per-target agreement and latency of the shadow candidate versus the primary model"""
+    if shadow_scorer is None:
+        raise HTTPException(status_code=503, detail="Shadow scoring is disabled (set SHADOW_MODEL_PATH)")
+    return shadow_scorer.stats()
+
+@app.get("/analytics")
+def analytics(request: Request):
+    """Cohort aggregates (type/severity by age band, PTA histograms, tympanogram mix)"""
+    if cohort_analytics is None:
+        raise HTTPException(status_code=503, detail="Cohort analytics unavailable")
+    etag, payload = cohort_analytics.snapshot()
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+    return JSONResponse(content=payload, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+def require_admin(token: Optional[str]):
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints disabled (ADMIN_TOKEN not set)")
+    if not token or not hmac.compare_digest(token, admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/admin/profile/start")
+def start_profiling(requests: Optional[int] = None, seconds: Optional[float] = None, interval_ms: float = 5.0,
+                    trace_memory: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Sample CPU stacks for the next N scoring requests and/or T seconds"""
+    require_admin(x_admin_token)
+    if not requests and not seconds:
+        raise HTTPException(status_code=400, detail="Specify requests and/or seconds")
+    if interval_ms < 1:
+        raise HTTPException(status_code=400, detail="interval_ms must be at least 1")
+    try:
+        return profiler.start(requests, seconds, interval_ms, trace_memory)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/admin/profile/stop")
+def stop_profiling(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    profiler.stop()
+    return profiler.status()
+
+@app.get("/admin/profile/status")
+def profiling_status(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return profiler.status()
+
+@app.get("/admin/profile/result")
+def profiling_result(format: str = 'json', x_admin_token: Optional[str] = Header(None)):
+    """Last profile: JSON summary with per-stage times, or collapsed stacks for flamegraphs"""
+    require_admin(x_admin_token)
+    if profiler.last_result is None:
+        raise HTTPException(status_code=404, detail="No completed profiling session")
+    if format == 'collapsed':
+        return PlainTextResponse(profiler.collapsed())
+    return profiler.last_result
 
 @app.get("/model-info")
 def get_model_info():
@@ -312,6 +922,13 @@ def get_model_info():
         } if model_columns else {}
     }
 
+    info["variants"] = {
+        name: {"features": len(variant_columns), "file": MODEL_VARIANT_FILES[name],
+               "version": model_versions[name]}
+        for name, (_, _, _, variant_columns) in model_variants.items()
+    }
+    info["default_variant"] = DEFAULT_MODEL_VARIANT
+
     # Add label encoder mappings
     if label_encoders:
         info["label_mappings"] = {}
@@ -0,0 +1,236 @@
+import os
+os.environ.setdefault('AUDIT_ENABLED', 'false')  # keep the harness from writing audit rows
+
+import argparse
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+import generate_dataset
+import model_server
+from model_server import PredictionRequest, build_feature_frame, score_feature_frame, score_feature_frames
+from streaming_session import AudiometrySession
+
+logging.getLogger('model_server').setLevel(logging.WARNING)
+
+# Golden-output parity harness: every alternative inference path must
+# reproduce the reference predict() pipeline on a deterministic corpus.
+
+TARGETS = ['hearing_loss', 'hearing_loss_type', 'hearing_loss_severity']
+TYMP_TYPES = ['A', 'As', 'Ad', 'B', 'C']
+LABEL_COLUMNS = ['hearing_loss', 'hearing_loss_type', 'hearing_loss_severity']
+
+# Declared tolerances per output field
+CONFIDENCE_TOLERANCE = 1e-6
+SUMMARY_TOLERANCE = 1e-9
+
+
+# --- 1. Deterministic Corpus ---
+def generate_corpus(size: int, seed: int) -> List[Dict]:
+    """Synthetic patients from generate_dataset.py plus boundary edge cases"""
+    random.seed(seed)
+    np.random.seed(seed)
+    records = []
+    for _ in range(size):
+        record = generate_dataset.generate_patient_record()
+        for col in LABEL_COLUMNS:
+            record.pop(col, None)
+        records.append(record)
+
+    base = dict(records[0])
+    threshold_cols = [c for c in base if c.startswith(('ac_', 'bc_', 'srt_'))]
+    for bound in [-10, 120]:
+        for wrs in [0, 100]:
+            edge = dict(base, **{c: bound for c in threshold_cols}, wrs_l=wrs, wrs_r=wrs)
+            records.append(edge)
+    # Every tympanogram combination, including one-sided bound audiograms
+    for i, tymp_l in enumerate(TYMP_TYPES):
+        for j, tymp_r in enumerate(TYMP_TYPES):
+            edge = dict(base, tymp_type_l=tymp_l, tymp_type_r=tymp_r)
+            if (i + j) % 2:
+                edge.update({c: 120 for c in threshold_cols if '_l' in c})
+            records.append(edge)
+    # Optional advanced-test fields at their limits
+    records.append(dict(base, oae_500_present=1, oae_1000_present=1, oae_4000_present=1,
+                        abr_wave_i_latency=10.0, abr_wave_iii_latency=10.0, abr_wave_v_latency=10.0,
+                        abr_wave_v_absent=1, age=120))
+    records.append(dict(base, age=0, abr_wave_i_latency=0.0, abr_wave_v_absent=0))
+    return records
+
+
+# --- 2. Engines ---
+def _format_output(prediction_result: dict, confidence_scores: dict, clinical_summary: dict) -> dict:
+    return json.loads(json.dumps(dict(prediction_result, confidence_scores=confidence_scores,
+                                      clinical_summary=clinical_summary), default=float))
+
+
+def reference_engine(records: List[Dict], timings: Dict[str, float]) -> List[dict]:
+    """The predict() pipeline, one request at a time"""
+    variant_model, variant_encoders, variant_columns = model_server.get_model_variant('full')
+    outputs = []
+    for record in records:
+        start = time.perf_counter()
+        data_dict = PredictionRequest(**record).model_dump()
+        timings['validation'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        data_df = build_feature_frame([data_dict])
+        timings['feature_engineering'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = score_feature_frame(data_df, variant_model, variant_encoders, variant_columns)
+        timings['scoring'] += time.perf_counter() - start
+        outputs.append(_format_output(*result[:3]))
+    return outputs
+
+
+def batched_engine(records: List[Dict], timings: Dict[str, float]) -> List[dict]:
+    """Whole-corpus feature engineering and a single model call, as in /predict/batch"""
+    variant_model, variant_encoders, variant_columns = model_server.get_model_variant('full')
+
+    start = time.perf_counter()
+    data_dicts = [PredictionRequest(**record).model_dump() for record in records]
+    timings['validation'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    data_df = build_feature_frame(data_dicts)
+    timings['feature_engineering'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    rows, _ = score_feature_frames(data_df, variant_model, variant_encoders, variant_columns)
+    timings['scoring'] += time.perf_counter() - start
+    return [_format_output(*row) for row in rows]
+
+
+def streaming_session_engine(records: List[Dict], timings: Dict[str, float]) -> List[dict]:
+    """Incremental AudiometrySession features, one field at a time"""
+    variant_model, variant_encoders, variant_columns = model_server.get_model_variant('full')
+    outputs = []
+    for record in records:
+        start = time.perf_counter()
+        updates = model_server.validate_session_updates(record)
+        timings['validation'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        session = AudiometrySession(model_server.REQUIRED_FIELDS, model_server.OPTIONAL_DEFAULTS)
+        for field, value in updates.items():
+            session.update({field: value})
+        data_df = session.feature_frame()
+        timings['feature_engineering'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = score_feature_frame(data_df, variant_model, variant_encoders, variant_columns)
+        timings['scoring'] += time.perf_counter() - start
+        outputs.append(_format_output(*result[:3]))
+    return outputs
+
+
+# Alternative inference paths under test; register new engines here
+ENGINES: Dict[str, Callable] = {
+    'reference': reference_engine,
+    'batched': batched_engine,
+    'streaming_session': streaming_session_engine,
+}
+
+
+# --- 3. Comparison ---
+def compare_outputs(golden: dict, candidate: dict) -> List[str]:
+    """Names of fields where candidate differs from golden beyond tolerance"""
+    mismatches = []
+    for target in TARGETS:
+        if golden[target] != candidate[target]:
+            mismatches.append(target)
+        if abs(golden['confidence_scores'][target] - candidate['confidence_scores'][target]) > CONFIDENCE_TOLERANCE:
+            mismatches.append(f'confidence_scores.{target}')
+    for key, value in golden['clinical_summary'].items():
+        other = candidate['clinical_summary'].get(key)
+        if key == 'clinical_notes':
+            if value != other:
+                mismatches.append('clinical_summary.clinical_notes')
+        elif other is None or abs(value - other) > SUMMARY_TOLERANCE:
+            mismatches.append(f'clinical_summary.{key}')
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Golden-output parity check for fast inference paths")
+    parser.add_argument('--golden', default='parity_golden.jsonl', help="Golden corpus/output file")
+    parser.add_argument('--write-golden', action='store_true',
+                        help="Regenerate the corpus and golden outputs from the reference engine")
+    parser.add_argument('--size', type=int, default=2000, help="Generated corpus size (with --write-golden)")
+    parser.add_argument('--seed', type=int, default=42, help="Corpus random seed (with --write-golden)")
+    parser.add_argument('--engines', nargs='*', default=[e for e in ENGINES if e != 'reference'],
+                        help=f"Engines to compare against golden outputs ({', '.join(ENGINES)})")
+    args = parser.parse_args()
+
+    if model_server.model is None:
+        print("Error: model artifacts not loaded. Run train_model.py first.")
+        exit(1)
+
+    if args.write_golden:
+        records = generate_corpus(args.size, args.seed)
+        print(f"Generated parity corpus of {len(records)} records (seed {args.seed})")
+        reference_timings = defaultdict(float)
+        golden_outputs = reference_engine(records, reference_timings)
+        with open(args.golden, 'w') as f:
+            for record, output in zip(records, golden_outputs):
+                f.write(json.dumps({'input': record, 'output': output}) + '\n')
+        print(f"Golden outputs written to '{args.golden}'")
+
+    try:
+        with open(args.golden) as f:
+            golden_rows = [json.loads(line) for line in f]
+    except FileNotFoundError:
+        print(f"Error: '{args.golden}' not found. Run with --write-golden first.")
+        exit(1)
+
+    records = [row['input'] for row in golden_rows]
+    golden_outputs = [row['output'] for row in golden_rows]
+    print(f"Loaded {len(records)} golden records from '{args.golden}'")
+
+    # Always time the reference path so stage timings can be compared
+    engines = ['reference'] + [e for e in args.engines if e != 'reference']
+    timing_rows = []
+    failed = False
+    for engine_name in engines:
+        if engine_name not in ENGINES:
+            print(f"Unknown engine '{engine_name}'")
+            failed = True
+            continue
+        timings = defaultdict(float)
+        start = time.perf_counter()
+        outputs = ENGINES[engine_name](records, timings)
+        total = time.perf_counter() - start
+
+        mismatch_counts = defaultdict(int)
+        mismatched_records = 0
+        for golden, candidate in zip(golden_outputs, outputs):
+            fields = compare_outputs(golden, candidate)
+            mismatched_records += bool(fields)
+            for field in fields:
+                mismatch_counts[field] += 1
+
+        status = "PASS" if mismatched_records == 0 else "FAIL"
+        failed |= mismatched_records > 0
+        print(f"\n[{status}] {engine_name}: {mismatched_records}/{len(records)} records differ")
+        for field, count in sorted(mismatch_counts.items()):
+            print(f"  - {field}: {count}")
+
+        timing_rows.append(dict(
+            {'engine': engine_name, 'total_ms': total * 1000},
+            **{f'{stage}_ms': timings[stage] * 1000 for stage in ['validation', 'feature_engineering', 'scoring']}
+        ))
+
+    print("\nPer-stage timing (whole corpus):")
+    print(pd.DataFrame(timing_rows).round(1).to_string(index=False))
+
+    if failed:
+        print("\n❌ Parity check failed")
+        exit(1)
+    print("\n✅ All engines match the golden outputs")
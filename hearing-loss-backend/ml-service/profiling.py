@@ -0,0 +1,208 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional
+
+# Innermost matching frame decides which pipeline stage a sample belongs to
+STAGE_MARKERS = {
+    'request_body_to_args': 'validation',
+    'solve_dependencies': 'validation',
+    'serialize_response': 'serialization',
+    'perform_feature_engineering': 'feature_engineering',
+    'build_feature_frame': 'feature_engineering',
+    'generate_clinical_summary': 'clinical_summary',
+    'record_prediction': 'post_processing',
+}
+MODEL_CALL_FILES = ('multioutput.py', os.path.join('xgboost', 'sklearn.py'), os.path.join('xgboost', 'core.py'))
+# Leaf frames of a thread that is blocked rather than running (event loop
+# waiting on the threadpool, lock/condition waits)
+IDLE_LEAF_FRAMES = {('selectors.py', 'select'), ('threading.py', 'wait'), ('queue.py', 'get')}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _sample_stage(frames) -> str:
+    """Stage of a stack sample, given frames ordered leaf first"""
+    for frame in frames:
+        code = frame.f_code
+        if code.co_filename.endswith(MODEL_CALL_FILES):
+            return 'model'
+        if code.co_name in STAGE_MARKERS:
+            return STAGE_MARKERS[code.co_name]
+    return 'other'
+
+
+class OnDemandProfiler:
+    """Sampling CPU profiler (plus optional tracemalloc) toggled at runtime.
+
+    A background thread samples the stacks of the threads currently serving
+    a scoring request every ``interval`` seconds while a session is active
+    and aggregates them into collapsed stacks (``a;b;c count``) ready for
+    flamegraph.pl or speedscope. Threads opt in via ``track_thread()`` or
+    the ``track`` decorator; samples of a blocked thread are dropped. When
+    no session is running nothing is sampled and the request path only
+    checks the ``active`` flag.
+    """
+
+    def __init__(self):
+        self.active = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._stacks = Counter()
+        self._stages = Counter()
+        self._session = {}
+        self._requests_remaining = None
+        self._memory_top = []
+        self._tracked_threads = Counter()
+        self.last_result = None
+
+    def start(self, requests: Optional[int] = None, seconds: Optional[float] = None,
+              interval_ms: float = 5.0, trace_memory: bool = False) -> dict:
+        with self._lock:
+            if self.active:
+                raise RuntimeError("A profiling session is already running")
+            self._stacks = Counter()
+            self._stages = Counter()
+            self._memory_top = []
+            self._requests_remaining = requests
+            self._stop_event.clear()
+            self._session = {
+                'started_at': time.time(),
+                'requests': requests,
+                'seconds': seconds,
+                'interval_ms': interval_ms,
+                'trace_memory': trace_memory,
+                'requests_profiled': 0,
+                'samples': 0
+            }
+            if trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+            self.active = True
+            self._thread = threading.Thread(
+                target=self._run_sampler, args=(interval_ms / 1000, seconds),
+                name='profile-sampler', daemon=True
+            )
+            self._thread.start()
+            return dict(self._session)
+
+    @contextmanager
+    def track_thread(self):
+        """Sample the calling thread while the block runs (no-op when idle)"""
+        if not self.active:
+            yield
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            self._tracked_threads[ident] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._tracked_threads[ident] -= 1
+                if self._tracked_threads[ident] <= 0:
+                    del self._tracked_threads[ident]
+
+    def track(self, func):
+        """Decorator form of ``track_thread()`` for sync endpoint functions"""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.track_thread():
+                return func(*args, **kwargs)
+        return wrapper
+
+    def request_finished(self):
+        """Count a profiled request; stops the session after the requested number"""
+        with self._lock:
+            if not self.active:
+                return
+            self._session['requests_profiled'] += 1
+            if self._requests_remaining is not None:
+                self._requests_remaining -= 1
+                if self._requests_remaining <= 0:
+                    self._stop_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def _run_sampler(self, interval: float, seconds: Optional[float]):
+        started = time.monotonic()
+        deadline = started + seconds if seconds else None
+        ticks = 0
+        try:
+            while not self._stop_event.wait(interval):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                self._take_sample()
+                ticks += 1
+        finally:
+            # Sampling overhead stretches the effective interval; use the measured one
+            effective_interval_ms = (time.monotonic() - started) * 1000 / ticks if ticks else interval * 1000
+            self._finish(effective_interval_ms)
+
+    def _take_sample(self):
+        with self._lock:
+            tracked = set(self._tracked_threads)
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident not in tracked:
+                continue
+            leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+            if leaf in IDLE_LEAF_FRAMES:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            thread_name = thread_names.get(ident, str(ident))
+            stack = ';'.join([thread_name] + [_frame_label(f) for f in reversed(frames)])
+            stage = _sample_stage(frames)
+            with self._lock:
+                self._stacks[stack] += 1
+                self._stages[stage] += 1
+                self._session['samples'] += 1
+
+    def _finish(self, effective_interval_ms: float):
+        with self._lock:
+            if self._session.get('trace_memory') and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, __file__),
+                    tracemalloc.Filter(False, tracemalloc.__file__)
+                ])
+                tracemalloc.stop()
+                self._memory_top = [
+                    {'location': str(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1),
+                     'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:25]
+                ]
+            self.last_result = {
+                'session': dict(self._session, finished_at=time.time(),
+                                effective_interval_ms=round(effective_interval_ms, 3)),
+                'stages_ms': {stage: round(count * effective_interval_ms, 1)
+                              for stage, count in self._stages.most_common()},
+                'stage_samples': dict(self._stages),
+                'collapsed_stacks': dict(self._stacks),
+                'memory_top': self._memory_top
+            }
+            self.active = False
+
+    def status(self) -> dict:
+        with self._lock:
+            return {'active': self.active, 'session': dict(self._session),
+                    'result_available': self.last_result is not None}
+
+    def collapsed(self) -> str:
+        """Folded stacks in the format consumed by flamegraph.pl / speedscope"""
+        if self.last_result is None:
+            return ''
+        return '\n'.join(f"{stack} {count}" for stack, count in self.last_result['collapsed_stacks'].items())
@@ -0,0 +1,83 @@
+import threading
+from collections import deque
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+def latency_summary(samples: Iterable[float]) -> dict:
+    values = np.array(list(samples))
+    if not len(values):
+        return {'count': 0, 'mean_ms': None, 'p50_ms': None, 'p95_ms': None}
+    return {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3)
+    }
+
+
+class RequestMetrics:
+    """Per-endpoint request counts and latency windows for the scoring paths.
+
+    Latencies are kept in bounded windows of the most recent ``window``
+    admitted requests; requests shed or expired before scoring are only
+    counted. Batch sizes and per-batch model time are tracked separately so
+    callers that aggregate requests can see how well batching is working.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.window = window
+        self._endpoints: Dict[str, dict] = {}
+        self.batch_sizes = deque(maxlen=window)
+        self.batch_model_ms = deque(maxlen=window)
+        self.batches = 0
+        self.batched_records = 0
+
+    def _endpoint(self, path: str) -> dict:
+        return self._endpoints.setdefault(path, {
+            'requests': 0, 'errors': 0, 'rejected': 0, 'latency_ms': deque(maxlen=self.window)
+        })
+
+    def record_request(self, path: str, status_code: int, latency_ms: float):
+        """An admitted request; only these enter the latency window"""
+        with self._lock:
+            endpoint = self._endpoint(path)
+            endpoint['requests'] += 1
+            endpoint['errors'] += status_code >= 500
+            endpoint['latency_ms'].append(latency_ms)
+
+    def record_rejected(self, path: str):
+        """A request shed or expired before scoring"""
+        with self._lock:
+            self._endpoint(path)['rejected'] += 1
+
+    def record_batch(self, size: int, model_latency_ms: float):
+        with self._lock:
+            self.batch_sizes.append(size)
+            self.batch_model_ms.append(model_latency_ms)
+            self.batches += 1
+            self.batched_records += size
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = np.array(self.batch_sizes)
+            return {
+                'endpoints': {
+                    path: {
+                        'requests': endpoint['requests'],
+                        'errors': endpoint['errors'],
+                        'rejected': endpoint['rejected'],
+                        'latency': latency_summary(endpoint['latency_ms'])
+                    }
+                    for path, endpoint in self._endpoints.items()
+                },
+                'batches': {
+                    'batches': self.batches,
+                    'records': self.batched_records,
+                    'mean_size': round(float(sizes.mean()), 2) if len(sizes) else None,
+                    'max_size': int(sizes.max()) if len(sizes) else None,
+                    'model_latency': latency_summary(self.batch_model_ms)
+                }
+            }
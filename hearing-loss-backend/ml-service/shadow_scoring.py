@@ -0,0 +1,136 @@
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from request_metrics import latency_summary
+
+logger = logging.getLogger(__name__)
+
+TARGET_NAMES = ['hearing_loss', 'hearing_loss_type', 'hearing_loss_severity']
+
+
+def decode_predictions(prediction_numeric: np.ndarray, label_encoders: dict) -> dict:
+    """Decode the first row of a MultiOutputClassifier prediction into labels"""
+    return {
+        'hearing_loss': "Yes" if prediction_numeric[0][0] == 1 else "No",
+        'hearing_loss_type': str(label_encoders['hearing_loss_type'].classes_[int(prediction_numeric[0][1])]),
+        'hearing_loss_severity': str(label_encoders['hearing_loss_severity'].classes_[int(prediction_numeric[0][2])])
+    }
+
+
+class ShadowScorer:
+    """Scores mirrored requests with a candidate model in background workers.
+
+    ``submit()`` only enqueues (after sampling) and never waits; when the
+    bounded queue is full the mirrored request is dropped. Workers record
+    per-target agreement with the primary model and model-call latency for
+    both models.
+    """
+
+    def __init__(self, model, label_encoders: dict, model_columns: list, version: str,
+                 sample_rate: float = 1.0, queue_size: int = 1000, workers: int = 2,
+                 latency_window: int = 1000):
+        self.model = model
+        self.label_encoders = label_encoders
+        self.model_columns = model_columns
+        self.version = version
+        self.sample_rate = sample_rate
+        self.n_workers = workers
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._workers = []
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.scored = 0
+        self.errors = 0
+        self.agreements = {target: 0 for target in TARGET_NAMES}
+        self.primary_latency_ms = deque(maxlen=latency_window)
+        self.shadow_latency_ms = deque(maxlen=latency_window)
+
+    def start(self):
+        self._stop_event.clear()
+        for i in range(self.n_workers):
+            worker = threading.Thread(target=self._run_worker, name=f'shadow-scorer-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def submit(self, data_df: pd.DataFrame, primary_prediction: dict, primary_latency_ms: float) -> bool:
+        """Mirror a scored request to the candidate model; never blocks"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self.sampled_out += 1
+            return False
+        try:
+            self._queue.put_nowait((data_df, primary_prediction, primary_latency_ms))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _run_worker(self):
+        while not self._stop_event.is_set():
+            try:
+                data_df, primary_prediction, primary_latency_ms = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._score(data_df, primary_prediction, primary_latency_ms)
+            except Exception as e:
+                logger.warning(f"Shadow scoring failed: {e}")
+                with self._lock:
+                    self.errors += 1
+
+    def _score(self, data_df: pd.DataFrame, primary_prediction: dict, primary_latency_ms: float):
+        model_input = data_df.reindex(columns=self.model_columns, fill_value=0)
+        start = time.perf_counter()
+        prediction_numeric = self.model.predict(model_input)
+        self.model.predict_proba(model_input)
+        shadow_latency_ms = (time.perf_counter() - start) * 1000
+        shadow_prediction = decode_predictions(prediction_numeric, self.label_encoders)
+
+        with self._lock:
+            self.scored += 1
+            for target in TARGET_NAMES:
+                if shadow_prediction[target] == primary_prediction[target]:
+                    self.agreements[target] += 1
+            self.primary_latency_ms.append(primary_latency_ms)
+            self.shadow_latency_ms.append(shadow_latency_ms)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'candidate_version': self.version,
+                'sample_rate': self.sample_rate,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'submitted': self.submitted,
+                'sampled_out': self.sampled_out,
+                'dropped': self.dropped,
+                'scored': self.scored,
+                'errors': self.errors,
+                'agreement_rate': {
+                    target: round(count / self.scored, 4) if self.scored else None
+                    for target, count in self.agreements.items()
+                },
+                'latency': {
+                    'primary': latency_summary(self.primary_latency_ms),
+                    'shadow': latency_summary(self.shadow_latency_ms)
+                }
+            }
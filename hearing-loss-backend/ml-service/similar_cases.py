@@ -0,0 +1,77 @@
+import os
+import re
+from typing import Dict, List
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+AUDIOMETRIC_PATTERN = re.compile(r'^((ac|bc)_[lr]_\d+|(srt|wrs)_[lr])$')
+CASE_COLUMNS = ['age', 'sex', 'hearing_loss', 'hearing_loss_type', 'hearing_loss_severity']
+
+
+def audiometric_columns(columns: List[str]) -> List[str]:
+    """Raw AC/BC threshold, SRT and WRS columns of the dataset"""
+    return [col for col in columns if AUDIOMETRIC_PATTERN.match(col)]
+
+
+def dataset_fingerprint(data_path: str) -> str:
+    stat = os.stat(data_path)
+    return f"{stat.st_size}-{int(stat.st_mtime)}"
+
+
+class SimilarCaseIndex:
+    """Ball tree over z-score normalized audiometric vectors of prior patients"""
+
+    def __init__(self, tree: BallTree, columns: List[str], mean: np.ndarray, scale: np.ndarray,
+                 cases: pd.DataFrame, fingerprint: str = None):
+        self.tree = tree
+        self.columns = columns
+        self.mean = mean
+        self.scale = scale
+        self.cases = cases
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, fingerprint: str = None) -> 'SimilarCaseIndex':
+        columns = audiometric_columns(df.columns.tolist())
+        vectors = df[columns].to_numpy(dtype=float)
+        mean = vectors.mean(axis=0)
+        scale = vectors.std(axis=0)
+        scale[scale == 0] = 1.0
+        tree = BallTree((vectors - mean) / scale)
+        cases = df[[col for col in CASE_COLUMNS if col in df.columns]].reset_index(drop=True)
+        return cls(tree, columns, mean, scale, cases, fingerprint)
+
+    @classmethod
+    def load_or_build(cls, index_path: str, data_path: str) -> 'SimilarCaseIndex':
+        """Load a persisted index, rebuilding it if the dataset has changed"""
+        fingerprint = dataset_fingerprint(data_path)
+        if os.path.exists(index_path):
+            index = joblib.load(index_path)
+            if index.fingerprint == fingerprint:
+                return index
+        index = cls.build(pd.read_csv(data_path), fingerprint)
+        index.save(index_path)
+        return index
+
+    def save(self, index_path: str):
+        joblib.dump(self, index_path)
+
+    def query(self, records: List[Dict], k: int = 5) -> List[List[Dict]]:
+        """Top-k nearest prior cases for each record, computed in one tree query"""
+        k = max(1, min(k, len(self.cases)))
+        vectors = np.array([[record[col] for col in self.columns] for record in records], dtype=float)
+        distances, indices = self.tree.query((vectors - self.mean) / self.scale, k=k)
+
+        # Fetch the case details of all neighbors in one lookup
+        neighbor_cases = self.cases.iloc[indices.ravel()].to_dict('records')
+        results = []
+        for i, (row_distances, row_indices) in enumerate(zip(distances, indices)):
+            row_cases = neighbor_cases[i * k:(i + 1) * k]
+            results.append([
+                dict({'case_id': int(idx), 'distance': round(float(distance), 4)}, **case)
+                for distance, idx, case in zip(row_distances, row_indices, row_cases)
+            ])
+        return results
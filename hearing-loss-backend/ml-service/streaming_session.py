@@ -0,0 +1,112 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+PTA_FREQS = [500, 1000, 2000, 4000]
+ABG_FREQS = [500, 1000, 2000, 4000]
+
+
+def _mean(*values):
+    return sum(values) / len(values)
+
+
+def _engineered_feature_specs() -> List[Tuple[str, Tuple[str, ...], Callable]]:
+    """(feature, dependencies, formula) in dependency order.
+
+    Formulas mirror features.perform_feature_engineering term for term so
+    incremental results match the pandas pipeline exactly.
+    """
+    specs = []
+    for freq in ABG_FREQS:
+        for ear in ['l', 'r']:
+            specs.append((f'abg_{ear}_{freq}', (f'ac_{ear}_{freq}', f'bc_{ear}_{freq}'), lambda ac, bc: ac - bc))
+    for ear in ['l', 'r']:
+        specs.append((f'pta_{ear}', tuple(f'ac_{ear}_{freq}' for freq in PTA_FREQS),
+                      lambda a, b, c, d: (a + b + c + d) / 4))
+    specs.append(('pta_better', ('pta_l', 'pta_r'), lambda l, r: float(np.minimum(l, r))))
+    specs.append(('pta_worse', ('pta_l', 'pta_r'), lambda l, r: float(np.maximum(l, r))))
+    specs.append(('pta_asymmetry', ('pta_l', 'pta_r'), lambda l, r: float(np.abs(l - r))))
+    for ear in ['l', 'r']:
+        specs.append((f'hf_avg_{ear}', (f'ac_{ear}_4000', f'ac_{ear}_8000'), lambda a, b: (a + b) / 2))
+    for ear in ['l', 'r']:
+        specs.append((f'srt_pta_diff_{ear}', (f'srt_{ear}', f'pta_{ear}'), lambda srt, pta: srt - pta))
+    for ear in ['l', 'r']:
+        specs.append((f'abg_avg_{ear}', tuple(f'abg_{ear}_{freq}' for freq in ABG_FREQS),
+                      lambda a, b, c, d: (a + b + c + d) / 4))
+    specs.append(('bilateral_loss', ('pta_l', 'pta_r'), lambda l, r: int((l > 25) and (r > 25))))
+    specs.append(('unilateral_loss', ('pta_l', 'pta_r'),
+                  lambda l, r: int(((l > 25) and (r <= 25)) or ((r > 25) and (l <= 25)))))
+    return specs
+
+
+ENGINEERED_FEATURES = _engineered_feature_specs()
+ENGINEERED_ORDER = {name: i for i, (name, _, _) in enumerate(ENGINEERED_FEATURES)}
+
+
+def _build_dependents() -> Dict[str, Set[str]]:
+    """Map every raw or engineered field to the engineered features it affects (transitively)"""
+    direct = {}
+    for name, dependencies, _ in ENGINEERED_FEATURES:
+        for dependency in dependencies:
+            direct.setdefault(dependency, set()).add(name)
+
+    dependents = {}
+    for field in direct:
+        affected, stack = set(), list(direct[field])
+        while stack:
+            feature = stack.pop()
+            if feature not in affected:
+                affected.add(feature)
+                stack.extend(direct.get(feature, ()))
+        dependents[field] = affected
+    return dependents
+
+
+DEPENDENTS = _build_dependents()
+
+
+class AudiometrySession:
+    """Partially measured patient whose engineered features update incrementally.
+
+    Each update recomputes only the engineered features that depend on the
+    changed fields. Engineered features with a missing input stay ``None``.
+    """
+
+    def __init__(self, required_fields: List[str], defaults: Dict[str, Any]):
+        self.required_fields = required_fields
+        self.values: Dict[str, Any] = dict(defaults)
+        self.features: Dict[str, Optional[float]] = {name: None for name, _, _ in ENGINEERED_FEATURES}
+
+    def update(self, updates: Dict[str, Any]) -> List[str]:
+        """Apply validated field updates and return the recomputed feature names"""
+        self.values.update(updates)
+        dirty = set()
+        for field in updates:
+            dirty |= DEPENDENTS.get(field, set())
+
+        recomputed = sorted(dirty, key=ENGINEERED_ORDER.get)
+        for name in recomputed:
+            _, dependencies, formula = ENGINEERED_FEATURES[ENGINEERED_ORDER[name]]
+            inputs = [self._lookup(dependency) for dependency in dependencies]
+            self.features[name] = None if any(v is None for v in inputs) else formula(*inputs)
+        return recomputed
+
+    def _lookup(self, name: str):
+        if name in self.features:
+            return self.features[name]
+        return self.values.get(name)
+
+    def missing_fields(self) -> List[str]:
+        return [field for field in self.required_fields if self.values.get(field) is None]
+
+    def is_complete(self) -> bool:
+        return not self.missing_fields()
+
+    def feature_frame(self) -> pd.DataFrame:
+        """One-row engineered, one-hot encoded frame equivalent to build_feature_frame"""
+        row = dict(self.values)
+        row.update(self.features)
+        for col in ['tymp_type_l', 'tymp_type_r']:
+            row[f'{col}_{row.pop(col)}'] = True
+        return pd.DataFrame([row])
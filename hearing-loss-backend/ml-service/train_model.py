@@ -6,9 +6,29 @@ from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import joblib
+import argparse
+import os
+import time
 import warnings
+from drift_monitor import build_reference_profile, monitored_features
+from similar_cases import SimilarCaseIndex
+from joint_model import JointLabelClassifier, count_trees
 warnings.filterwarnings('ignore')
 
+# --- Command Line Options ---
+parser = argparse.ArgumentParser(description="Train the hearing loss XGBoost model")
+parser.add_argument('--compact', action='store_true',
+                    help="Also train a compact low-latency model variant")
+parser.add_argument('--compact-trees', type=int, default=60,
+                    help="Tree budget per target for the compact model")
+parser.add_argument('--compact-depth', type=int, default=4,
+                    help="Maximum tree depth for the compact model")
+parser.add_argument('--compact-top-k', type=int, default=None,
+                    help="Number of top features for the compact model (chosen on validation if omitted)")
+parser.add_argument('--joint', action='store_true',
+                    help="Also train a single joint-label booster and compare it with the per-target models")
+args = parser.parse_args()
+
 print("Starting XGBoost model training process...")
 
 # --- 1. Load and Validate Dataset ---
@@ -167,8 +187,10 @@ base_classifier = xgb.XGBClassifier(**xgb_params)
 model = MultiOutputClassifier(base_classifier, n_jobs=-1)
 
 print("Training the XGBoost model...")
+training_start = time.perf_counter()
 model.fit(X_train, y_train)
-print("Model training complete.")
+training_time_seconds = time.perf_counter() - training_start
+print(f"Model training complete in {training_time_seconds:.1f}s.")
 
 # --- 10. Model Evaluation ---
 print("\nEvaluating model performance...")
@@ -216,21 +238,194 @@ model_artifacts = {
     'training_accuracy': {
         target: accuracy_score(y_test.iloc[:, i], y_pred_df.iloc[:, i])
         for i, target in enumerate(target_cols)
-    }
+    },
+    'training_time_seconds': training_time_seconds,
+    'training_samples': X_train.shape[0],
+    'version': 1
 }
 
 model_filename = 'hearing_loss_model.pkl'
 joblib.dump(model_artifacts, model_filename)
 joblib.dump(model, 'hearing_loss_model_only.pkl')  # Just the model for backward compatibility
 
+# Reference profile of the training inputs for the serving-side drift monitor
+drift_reference = build_reference_profile(X_train, monitored_features(model_columns))
+joblib.dump(drift_reference, 'drift_reference.pkl')
+
+# Nearest-neighbour index of prior cases for the /similar endpoint
+SimilarCaseIndex.load_or_build('similar_case_index.pkl', 'synthetic_hearing_loss_data.csv')
+
 print(f"\nModel and artifacts saved successfully:")
 print(f"- Main model file: '{model_filename}'")
 print(f"- Model only: 'hearing_loss_model_only.pkl'")
 print(f"- Label encoders: 'label_encoders.pkl'")
 print(f"- Feature info: 'model_feature_info.pkl'")
 print(f"- Feature importance: 'feature_importance.csv'")
+print(f"- Drift reference profile: 'drift_reference.pkl'")
+print(f"- Similar-case index: 'similar_case_index.pkl'")
+
+# --- 13. Compact Model Variant (Optional) ---
+def measure_latency(estimator, X_eval, repeats=50):
+    """Return mean single-row and full-batch predict_proba latency in milliseconds"""
+    single_row = X_eval.iloc[[0]]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        estimator.predict_proba(single_row)
+    single_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    start = time.perf_counter()
+    estimator.predict_proba(X_eval)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return single_ms, batch_ms
+
+def evaluate_accuracy(estimator, X_eval, y_eval):
+    """Per-target accuracy of a multi-output estimator"""
+    predictions = estimator.predict(X_eval)
+    return {
+        target: accuracy_score(y_eval.iloc[:, i], predictions[:, i])
+        for i, target in enumerate(target_cols)
+    }
 
-# --- 13. Model Summary ---
+if args.compact:
+    print(f"\n{'='*50}")
+    print("TRAINING COMPACT MODEL VARIANT")
+    print(f"{'='*50}")
+
+    def rank_features(estimator):
+        """Features ordered by their mean importance across all three targets"""
+        combined_importance = pd.DataFrame({
+            'feature': model_columns,
+            'importance': np.mean([est.feature_importances_ for est in estimator.estimators_], axis=0)
+        }).sort_values('importance', ascending=False)
+        return combined_importance['feature'].tolist()
+
+    compact_params = dict(xgb_params,
+                          n_estimators=args.compact_trees,
+                          max_depth=args.compact_depth)
+
+    def build_compact_model():
+        return MultiOutputClassifier(xgb.XGBClassifier(**compact_params), n_jobs=-1)
+
+    if args.compact_top_k:
+        ranked_features = rank_features(model)
+        top_k = min(args.compact_top_k, len(ranked_features))
+    else:
+        # Choose the smallest feature subset whose validation accuracy is
+        # within half a point of the best candidate. The ranking comes from a
+        # full-size model fitted without the validation rows so they stay unseen.
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.25, random_state=42, stratify=y_train['hearing_loss']
+        )
+        ranking_model = MultiOutputClassifier(xgb.XGBClassifier(**xgb_params), n_jobs=-1)
+        ranking_model.fit(X_fit, y_fit)
+        ranked_features = rank_features(ranking_model)
+
+        candidate_scores = {}
+        for k in [5, 10, 15, 20, 30, 40]:
+            if k > len(ranked_features):
+                continue
+            candidate = build_compact_model()
+            candidate.fit(X_fit[ranked_features[:k]], y_fit)
+            val_accuracy = evaluate_accuracy(candidate, X_val[ranked_features[:k]], y_val)
+            candidate_scores[k] = np.mean(list(val_accuracy.values()))
+            print(f"  top-{k} features: mean validation accuracy {candidate_scores[k]:.4f}")
+
+        best_score = max(candidate_scores.values())
+        top_k = min(k for k, score in candidate_scores.items() if score >= best_score - 0.005)
+
+    compact_columns = ranked_features[:top_k]
+    print(f"Compact model: {args.compact_trees} trees/target, max_depth {args.compact_depth}, "
+          f"{len(compact_columns)} features")
+
+    compact_model = build_compact_model()
+    compact_model.fit(X_train[compact_columns], y_train)
+
+    compact_feature_info = dict(feature_info,
+                                model_columns=compact_columns,
+                                n_features=len(compact_columns))
+    compact_accuracy = evaluate_accuracy(compact_model, X_test[compact_columns], y_test)
+
+    joblib.dump({
+        'model': compact_model,
+        'feature_info': compact_feature_info,
+        'label_encoders': label_encoders,
+        'training_accuracy': compact_accuracy,
+        'variant': 'compact',
+        'params': {'n_estimators': args.compact_trees, 'max_depth': args.compact_depth, 'top_k': top_k}
+    }, 'hearing_loss_model_compact.pkl')
+
+    # Side-by-side accuracy and latency report
+    full_accuracy = model_artifacts['training_accuracy']
+    full_single_ms, full_batch_ms = measure_latency(model, X_test)
+    compact_single_ms, compact_batch_ms = measure_latency(compact_model, X_test[compact_columns])
+
+    report_df = pd.DataFrame([
+        dict({'variant': 'full', 'features': len(model_columns),
+              'trees_per_target': xgb_params['n_estimators'], 'max_depth': xgb_params['max_depth'],
+              'single_row_ms': full_single_ms, 'batch_ms': full_batch_ms},
+             **{f'{t}_accuracy': acc for t, acc in full_accuracy.items()}),
+        dict({'variant': 'compact', 'features': len(compact_columns),
+              'trees_per_target': args.compact_trees, 'max_depth': args.compact_depth,
+              'single_row_ms': compact_single_ms, 'batch_ms': compact_batch_ms},
+             **{f'{t}_accuracy': acc for t, acc in compact_accuracy.items()})
+    ])
+    report_df.to_csv('model_variant_report.csv', index=False)
+
+    print("\nFull vs compact model:")
+    print(report_df.to_string(index=False))
+    print("- Compact model: 'hearing_loss_model_compact.pkl'")
+    print("- Variant report: 'model_variant_report.csv'")
+
+# --- 14. Joint Multi-Output Booster (Optional) ---
+if args.joint:
+    print(f"\n{'='*50}")
+    print("TRAINING JOINT MULTI-OUTPUT BOOSTER")
+    print(f"{'='*50}")
+
+    joint_params = {k: v for k, v in xgb_params.items() if k not in ('use_label_encoder',)}
+    joint_model = JointLabelClassifier(**joint_params)
+    joint_training_start = time.perf_counter()
+    joint_model.fit(X_train, y_train)
+    joint_training_seconds = time.perf_counter() - joint_training_start
+    print(f"Joint label space: {len(joint_model.combinations_)} (binary, type, severity) combinations")
+
+    joint_accuracy = evaluate_accuracy(joint_model, X_test, y_test)
+    joint_filename = 'hearing_loss_model_joint.pkl'
+    joblib.dump({
+        'model': joint_model,
+        'feature_info': feature_info,
+        'label_encoders': label_encoders,
+        'training_accuracy': joint_accuracy,
+        'training_time_seconds': joint_training_seconds,
+        'training_samples': X_train.shape[0],
+        'variant': 'joint'
+    }, joint_filename)
+
+    full_single_ms, full_batch_ms = measure_latency(model, X_test)
+    joint_single_ms, joint_batch_ms = measure_latency(joint_model, X_test)
+    joint_report_df = pd.DataFrame([
+        dict({'model': 'per-target (MultiOutputClassifier)',
+              'total_trees': sum(count_trees(est.get_booster()) for est in model.estimators_),
+              'artifact_kb': os.path.getsize(model_filename) / 1024,
+              'training_s': training_time_seconds,
+              'single_row_ms': full_single_ms, 'batch_ms': full_batch_ms},
+             **{f'{t}_accuracy': acc for t, acc in model_artifacts['training_accuracy'].items()}),
+        dict({'model': 'joint (multi_output_tree)',
+              'total_trees': joint_model.n_trees,
+              'artifact_kb': os.path.getsize(joint_filename) / 1024,
+              'training_s': joint_training_seconds,
+              'single_row_ms': joint_single_ms, 'batch_ms': joint_batch_ms},
+             **{f'{t}_accuracy': acc for t, acc in joint_accuracy.items()})
+    ])
+    joint_report_df.to_csv('joint_model_report.csv', index=False)
+
+    print("\nPer-target vs joint model:")
+    print(joint_report_df.round(4).to_string(index=False))
+    print(f"- Joint model: '{joint_filename}' (serve with ?variant=joint)")
+    print("- Joint report: 'joint_model_report.csv'")
+
+# --- 15. Model Summary ---
 print(f"\n{'='*50}")
 print("MODEL TRAINING SUMMARY")
 print(f"{'='*50}")
@@ -0,0 +1,178 @@
+import pandas as pd
+import xgboost as xgb
+from sklearn.multioutput import MultiOutputClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+from features import build_feature_frame
+import argparse
+import copy
+import json
+import time
+import joblib
+import warnings
+warnings.filterwarnings('ignore')
+
+# Incrementally continue boosting the saved per-target XGBoost models on a
+# newly labeled batch. Label encoders and model columns stay fixed so the
+# updated artifact is a drop-in replacement for the served model.
+
+TARGETS = ['hearing_loss', 'hearing_loss_type', 'hearing_loss_severity']
+
+parser = argparse.ArgumentParser(description="Incrementally update the hearing loss model on a new labeled batch")
+parser.add_argument('batch_csv', help="CSV of newly labeled patients (same columns as the training data)")
+parser.add_argument('--base-model', default='hearing_loss_model.pkl',
+                    help="Model artifact to continue boosting from")
+parser.add_argument('--rounds', type=int, default=50,
+                    help="Additional boosting rounds per target")
+parser.add_argument('--holdout', type=float, default=0.2,
+                    help="Fraction of the batch held out for validation")
+parser.add_argument('--output', default=None,
+                    help="Output artifact path (default: hearing_loss_model_v<version>.pkl)")
+parser.add_argument('--benchmark-full', action='store_true',
+                    help="Also time a full retrain on the base data plus the batch for comparison")
+parser.add_argument('--base-data', default='synthetic_hearing_loss_data.csv',
+                    help="Original training data, used only with --benchmark-full")
+args = parser.parse_args()
+
+print("Starting incremental model update...")
+
+# --- 1. Load Base Artifacts and New Batch ---
+try:
+    base_artifacts = joblib.load(args.base_model)
+    batch_df = pd.read_csv(args.batch_csv)
+except FileNotFoundError as e:
+    print(f"Error: {e}")
+    exit()
+
+if not (isinstance(base_artifacts, dict) and 'model' in base_artifacts):
+    print(f"Error: '{args.base_model}' is not a full model artifact (expected train_model.py output).")
+    exit()
+
+base_model = base_artifacts['model']
+if not hasattr(base_model, 'estimators_'):
+    print(f"Error: '{args.base_model}' is not a per-target model; incremental updates need train_model.py output.")
+    exit()
+label_encoders = base_artifacts['label_encoders']
+feature_info = base_artifacts['feature_info']
+model_columns = feature_info['model_columns']
+base_version = base_artifacts.get('version', 1)
+print(f"Base model version {base_version} loaded. New batch shape: {batch_df.shape}")
+
+# --- 2. Prepare Features and Targets with the Fixed Encoders ---
+def prepare_xy(df: pd.DataFrame):
+    """Engineered feature matrix and encoded targets using the saved encoders"""
+    y = pd.DataFrame({'hearing_loss': df['hearing_loss'].astype(int)})
+    for col in ['hearing_loss_type', 'hearing_loss_severity']:
+        unseen = set(df[col].astype(str)) - set(label_encoders[col].classes_)
+        if unseen:
+            raise ValueError(f"{col} has labels unknown to the saved encoder: {sorted(unseen)}")
+        y[col] = label_encoders[col].transform(df[col].astype(str))
+
+    X = build_feature_frame(df.drop(columns=TARGETS).copy())
+    X = X.reindex(columns=model_columns, fill_value=0)
+    return X, y
+
+try:
+    X_batch, y_batch = prepare_xy(batch_df)
+except ValueError as e:
+    print(f"Error: {e}")
+    print("Run a full retrain with train_model.py to introduce new labels.")
+    exit()
+
+X_update, X_holdout, y_update, y_holdout = train_test_split(
+    X_batch, y_batch, test_size=args.holdout, random_state=42
+)
+print(f"Update samples: {X_update.shape[0]}, holdout samples: {X_holdout.shape[0]}")
+
+# --- 3. Continue Boosting Each Target ---
+def continue_boosting(estimator: xgb.XGBClassifier, X: pd.DataFrame, y: pd.Series, rounds: int):
+    """Add `rounds` trees to a fitted XGBClassifier without refitting existing ones.
+
+    The native training API is used so that batches missing some classes
+    still update the multi-class models with the original class layout.
+    """
+    booster = estimator.get_booster()
+    params = {k: v for k, v in estimator.get_xgb_params().items()
+              if v is not None and k not in ('use_label_encoder', 'eval_metric', 'n_jobs', 'random_state')}
+    num_class = int(json.loads(booster.save_config())['learner']['learner_model_param']['num_class'])
+    if num_class > 0:
+        params['num_class'] = num_class
+    params['seed'] = estimator.get_params().get('random_state') or 0
+
+    dtrain = xgb.DMatrix(X, label=y)
+    updated = copy.deepcopy(estimator)
+    updated._Booster = xgb.train(params, dtrain, num_boost_round=rounds, xgb_model=booster)
+    updated.n_estimators = (estimator.n_estimators or 0) + rounds
+    return updated
+
+print(f"\nContinuing boosting for {args.rounds} rounds per target...")
+update_start = time.perf_counter()
+updated_model = copy.deepcopy(base_model)
+updated_model.estimators_ = [
+    continue_boosting(estimator, X_update, y_update[target], args.rounds)
+    for estimator, target in zip(base_model.estimators_, TARGETS)
+]
+update_time_seconds = time.perf_counter() - update_start
+print(f"Incremental update complete in {update_time_seconds:.2f}s.")
+
+# --- 4. Validate on the Holdout ---
+def holdout_accuracy(estimator):
+    predictions = estimator.predict(X_holdout)
+    return {target: accuracy_score(y_holdout[target], predictions[:, i]) for i, target in enumerate(TARGETS)}
+
+base_accuracy = holdout_accuracy(base_model)
+updated_accuracy = holdout_accuracy(updated_model)
+
+print("\nHoldout accuracy (base -> updated):")
+for target in TARGETS:
+    print(f"- {target}: {base_accuracy[target]:.4f} -> {updated_accuracy[target]:.4f}")
+
+# --- 5. Compare with a Full Retrain ---
+full_retrain_seconds = None
+if args.benchmark_full:
+    print("\nBenchmarking a full retrain on base data plus the new batch...")
+    full_df = pd.concat([pd.read_csv(args.base_data), batch_df], ignore_index=True)
+    X_full, y_full = prepare_xy(full_df)
+    full_start = time.perf_counter()
+    MultiOutputClassifier(copy.deepcopy(base_model.estimator), n_jobs=-1).fit(X_full, y_full)
+    full_retrain_seconds = time.perf_counter() - full_start
+elif 'training_time_seconds' in base_artifacts:
+    # Scale the recorded full-training time by the grown dataset size
+    base_samples = base_artifacts.get('training_samples')
+    full_retrain_seconds = base_artifacts['training_time_seconds']
+    if base_samples:
+        full_retrain_seconds *= (base_samples + len(X_update)) / base_samples
+
+if full_retrain_seconds is not None:
+    print(f"\nFull retrain: {full_retrain_seconds:.2f}s, incremental update: {update_time_seconds:.2f}s "
+          f"(saved {full_retrain_seconds - update_time_seconds:.2f}s, "
+          f"{full_retrain_seconds / max(update_time_seconds, 1e-9):.1f}x faster)")
+else:
+    print("\nNo recorded full training time in the base artifact; use --benchmark-full to compare.")
+
+# --- 6. Save the New Artifact Version ---
+new_version = base_version + 1
+output_filename = args.output or f'hearing_loss_model_v{new_version}.pkl'
+joblib.dump({
+    'model': updated_model,
+    'feature_info': feature_info,
+    'label_encoders': label_encoders,
+    'training_accuracy': updated_accuracy,
+    # Estimated full-retrain time on the cumulative data, for the next update
+    'training_time_seconds': full_retrain_seconds,
+    'training_samples': (base_artifacts.get('training_samples') or 0) + len(X_update),
+    'version': new_version,
+    'parent_version': base_version,
+    'incremental_update': {
+        'batch_file': args.batch_csv,
+        'rounds': args.rounds,
+        'update_samples': len(X_update),
+        'holdout_samples': len(X_holdout),
+        'update_time_seconds': update_time_seconds,
+        'full_retrain_seconds': full_retrain_seconds,
+        'base_holdout_accuracy': base_accuracy
+    }
+}, output_filename)
+
+print(f"\n✅ Model version {new_version} saved to '{output_filename}'")
+print(f"Promote it by replacing 'hearing_loss_model.pkl', or try it first with SHADOW_MODEL_PATH={output_filename}")
@@ -0,0 +1,60 @@
+package com.example.sathish.hearing_loss_backend.config;
+
+import org.apache.hc.client5.http.config.ConnectionConfig;
+import org.apache.hc.client5.http.config.RequestConfig;
+import org.apache.hc.client5.http.impl.classic.CloseableHttpClient;
+import org.apache.hc.client5.http.impl.classic.HttpClients;
+import org.apache.hc.client5.http.impl.io.PoolingHttpClientConnectionManager;
+import org.apache.hc.client5.http.impl.io.PoolingHttpClientConnectionManagerBuilder;
+import org.apache.hc.core5.util.TimeValue;
+import org.apache.hc.core5.util.Timeout;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.context.annotation.Bean;
+import org.springframework.context.annotation.Configuration;
+import org.springframework.http.client.HttpComponentsClientHttpRequestFactory;
+import org.springframework.web.client.RestTemplate;
+
+@Configuration
+public class MlClientConfig {
+
+    @Value("${ml.client.max-connections:32}")
+    private int maxConnections;
+
+    @Value("${ml.client.connect-timeout-ms:1000}")
+    private long connectTimeoutMs;
+
+    @Value("${ml.client.connection-request-timeout-ms:500}")
+    private long connectionRequestTimeoutMs;
+
+    @Value("${ml.client.read-timeout-ms:5000}")
+    private long readTimeoutMs;
+
+    // Keep-alive connections to the Python service are reused instead of
+    // opening a new TCP connection for every prediction.
+    @Bean
+    public PoolingHttpClientConnectionManager mlConnectionManager() {
+        return PoolingHttpClientConnectionManagerBuilder.create()
+                .setMaxConnTotal(maxConnections)
+                .setMaxConnPerRoute(maxConnections)
+                .setDefaultConnectionConfig(ConnectionConfig.custom()
+                        .setConnectTimeout(Timeout.ofMilliseconds(connectTimeoutMs))
+                        .setSocketTimeout(Timeout.ofMilliseconds(readTimeoutMs))
+                        .build())
+                .build();
+    }
+
+    @Bean
+    public RestTemplate mlRestTemplate(PoolingHttpClientConnectionManager mlConnectionManager) {
+        CloseableHttpClient httpClient = HttpClients.custom()
+                .setConnectionManager(mlConnectionManager)
+                .setConnectionManagerShared(true)
+                .setDefaultRequestConfig(RequestConfig.custom()
+                        .setConnectionRequestTimeout(Timeout.ofMilliseconds(connectionRequestTimeoutMs))
+                        .setResponseTimeout(Timeout.ofMilliseconds(readTimeoutMs))
+                        .build())
+                .evictIdleConnections(TimeValue.ofSeconds(30))
+                .build();
+
+        return new RestTemplate(new HttpComponentsClientHttpRequestFactory(httpClient));
+    }
+}
@@ -2,11 +2,14 @@ package com.example.sathish.hearing_loss_backend.controller;
 
 import com.example.sathish.hearing_loss_backend.dto.PredictionRequest;
 import com.example.sathish.hearing_loss_backend.dto.PredictionResponse;
+import com.example.sathish.hearing_loss_backend.service.MlClientMetrics;
 import com.example.sathish.hearing_loss_backend.service.PredictionService;
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.*;
 
+import java.util.Map;
+
 @RestController
 @RequestMapping("/api")
 public class PredictionController {
@@ -14,6 +17,9 @@ public class PredictionController {
     @Autowired
     private PredictionService predictionService;
 
+    @Autowired
+    private MlClientMetrics mlClientMetrics;
+
     @PostMapping("/predict")
     public ResponseEntity<PredictionResponse> predictHearingLoss(@RequestBody PredictionRequest request) {
         try {
@@ -24,4 +30,10 @@ public class PredictionController {
             return ResponseEntity.internalServerError().build();
         }
     }
+
+    // Connection pool, batch size and latency statistics for calls to the ML service
+    @GetMapping("/predict/metrics")
+    public ResponseEntity<Map<String, Object>> predictionClientMetrics() {
+        return ResponseEntity.ok(mlClientMetrics.snapshot());
+    }
 }
@@ -0,0 +1,22 @@
+package com.example.sathish.hearing_loss_backend.dto;
+
+import com.fasterxml.jackson.annotation.JsonProperty;
+import lombok.Data;
+import java.util.List;
+import java.util.Map;
+
+@Data
+public class BatchPredictionResponse {
+    private List<Result> results;
+
+    // One entry per submitted record: a prediction, or the validation errors for that record only
+    @Data
+    public static class Result {
+        @JsonProperty("status_code")
+        private int statusCode;
+
+        private PredictionResponse prediction;
+
+        private List<Map<String, Object>> detail;
+    }
+}
@@ -0,0 +1,119 @@
+package com.example.sathish.hearing_loss_backend.service;
+
+import org.apache.hc.client5.http.impl.io.PoolingHttpClientConnectionManager;
+import org.apache.hc.core5.pool.PoolStats;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.stereotype.Component;
+
+import java.util.Arrays;
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.LongAdder;
+
+@Component
+public class MlClientMetrics {
+
+    private static final int LATENCY_WINDOW = 1024;
+
+    @Autowired
+    private PoolingHttpClientConnectionManager mlConnectionManager;
+
+    // Caller-visible latency of getPrediction (batch wait included)
+    private final LatencyWindow predictionLatency = new LatencyWindow(LATENCY_WINDOW);
+    private final LongAdder predictions = new LongAdder();
+    private final LongAdder predictionFailures = new LongAdder();
+
+    // HTTP calls to the ML service; a batch call counts once
+    private final LatencyWindow callLatency = new LatencyWindow(LATENCY_WINDOW);
+    private final LongAdder calls = new LongAdder();
+    private final LongAdder callFailures = new LongAdder();
+    private final LongAdder callRecords = new LongAdder();
+    private final AtomicInteger maxBatchSize = new AtomicInteger();
+
+    public void recordPrediction(long elapsedNanos, boolean success) {
+        predictions.increment();
+        if (!success) {
+            predictionFailures.increment();
+        }
+        predictionLatency.record(elapsedNanos);
+    }
+
+    public void recordCall(int records, long elapsedNanos, boolean success) {
+        calls.increment();
+        callRecords.add(records);
+        maxBatchSize.accumulateAndGet(records, Math::max);
+        if (!success) {
+            callFailures.increment();
+        }
+        callLatency.record(elapsedNanos);
+    }
+
+    public Map<String, Object> snapshot() {
+        Map<String, Object> predictionStats = new LinkedHashMap<>();
+        predictionStats.put("count", predictions.sum());
+        predictionStats.put("failures", predictionFailures.sum());
+        predictionStats.put("latency", predictionLatency.summary());
+
+        long callCount = calls.sum();
+        Map<String, Object> callStats = new LinkedHashMap<>();
+        callStats.put("count", callCount);
+        callStats.put("failures", callFailures.sum());
+        callStats.put("records", callRecords.sum());
+        callStats.put("mean_batch_size", callCount == 0 ? null : Math.round(callRecords.sum() * 100.0 / callCount) / 100.0);
+        callStats.put("max_batch_size", maxBatchSize.get());
+        callStats.put("latency", callLatency.summary());
+
+        PoolStats pool = mlConnectionManager.getTotalStats();
+        Map<String, Object> poolStats = new LinkedHashMap<>();
+        poolStats.put("leased", pool.getLeased());
+        poolStats.put("available", pool.getAvailable());
+        poolStats.put("pending", pool.getPending());
+        poolStats.put("max", pool.getMax());
+
+        Map<String, Object> snapshot = new LinkedHashMap<>();
+        snapshot.put("predictions", predictionStats);
+        snapshot.put("ml_calls", callStats);
+        snapshot.put("connection_pool", poolStats);
+        return snapshot;
+    }
+
+    // Ring buffer of the most recent latencies
+    private static class LatencyWindow {
+        private final long[] samples;
+        private int size;
+        private int next;
+
+        LatencyWindow(int capacity) {
+            this.samples = new long[capacity];
+        }
+
+        synchronized void record(long elapsedNanos) {
+            samples[next] = elapsedNanos;
+            next = (next + 1) % samples.length;
+            size = Math.min(size + 1, samples.length);
+        }
+
+        Map<String, Object> summary() {
+            long[] sorted;
+            synchronized (this) {
+                sorted = Arrays.copyOf(samples, size);
+            }
+            Arrays.sort(sorted);
+            Map<String, Object> summary = new LinkedHashMap<>();
+            summary.put("count", sorted.length);
+            summary.put("mean_ms", sorted.length == 0 ? null : toMillis(Arrays.stream(sorted).average().orElse(0)));
+            summary.put("p50_ms", sorted.length == 0 ? null : toMillis(percentile(sorted, 0.50)));
+            summary.put("p95_ms", sorted.length == 0 ? null : toMillis(percentile(sorted, 0.95)));
+            return summary;
+        }
+
+        private static double percentile(long[] sorted, double quantile) {
+            return sorted[(int) Math.ceil(quantile * sorted.length) - 1];
+        }
+
+        private static double toMillis(double nanos) {
+            return Math.round(nanos / 1_000) / 1_000.0;
+        }
+    }
+}
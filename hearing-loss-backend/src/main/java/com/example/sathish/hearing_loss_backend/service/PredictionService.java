@@ -1,29 +1,240 @@
 package com.example.sathish.hearing_loss_backend.service;
 
 
+import com.example.sathish.hearing_loss_backend.dto.BatchPredictionResponse;
 import com.example.sathish.hearing_loss_backend.dto.PredictionRequest;
 import com.example.sathish.hearing_loss_backend.dto.PredictionResponse;
+import jakarta.annotation.PostConstruct;
+import jakarta.annotation.PreDestroy;
+import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.beans.factory.annotation.Value;
+import org.springframework.http.HttpEntity;
+import org.springframework.http.HttpHeaders;
 import org.springframework.stereotype.Service;
 import org.springframework.web.client.RestTemplate;
 
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.TimeoutException;
+
 @Service
 public class PredictionService {
 
-    // The RestTemplate is Spring's primary tool for making HTTP requests.
-    private final RestTemplate restTemplate;
+    // Pooled, timeout-bounded RestTemplate (see MlClientConfig)
+    @Autowired
+    private RestTemplate restTemplate;
+
+    @Autowired
+    private MlClientMetrics metrics;
 
-    // This will read the URL of our Python service from application.properties
+    // This will read the URLs of our Python service from application.properties
     @Value("${ml.model.url}")
     private String mlModelUrl;
 
-    public PredictionService() {
-        this.restTemplate = new RestTemplate();
+    @Value("${ml.model.batch-url}")
+    private String mlBatchUrl;
+
+    @Value("${ml.batch.enabled:true}")
+    private boolean batchEnabled;
+
+    @Value("${ml.batch.max-size:32}")
+    private int maxBatchSize;
+
+    @Value("${ml.batch.max-wait-ms:5}")
+    private long maxBatchWaitMs;
+
+    @Value("${ml.client.max-connections:32}")
+    private int maxConnections;
+
+    @Value("${ml.client.connection-request-timeout-ms:500}")
+    private long connectionRequestTimeoutMs;
+
+    @Value("${ml.client.connect-timeout-ms:1000}")
+    private long connectTimeoutMs;
+
+    @Value("${ml.client.read-timeout-ms:5000}")
+    private long readTimeoutMs;
+
+    // Predictions waiting to be sent in the next /predict/batch call
+    private final BlockingQueue<PendingPrediction> pending = new LinkedBlockingQueue<>();
+    private ExecutorService batchSenders;
+    private Thread dispatcher;
+
+    @PostConstruct
+    void startBatching() {
+        if (!batchEnabled) {
+            return;
+        }
+        // One sender per pooled connection so batches never wait on each other for a socket
+        batchSenders = Executors.newFixedThreadPool(maxConnections, runnable -> {
+            Thread thread = new Thread(runnable, "ml-batch-sender");
+            thread.setDaemon(true);
+            return thread;
+        });
+        dispatcher = new Thread(this::dispatchBatches, "ml-batch-dispatcher");
+        dispatcher.setDaemon(true);
+        dispatcher.start();
+    }
+
+    @PreDestroy
+    void stopBatching() {
+        if (dispatcher != null) {
+            dispatcher.interrupt();
+        }
+        if (batchSenders != null) {
+            batchSenders.shutdown();
+        }
+        PendingPrediction leftover;
+        while ((leftover = pending.poll()) != null) {
+            leftover.future.completeExceptionally(new IllegalStateException("Prediction service is shutting down"));
+        }
     }
 
     public PredictionResponse getPrediction(PredictionRequest request) {
-        // Make a POST request to the Python Flask service's /predict endpoint,
+        long start = System.nanoTime();
+        boolean success = false;
+        try {
+            PredictionResponse response = batchEnabled ? awaitBatchedPrediction(request) : postPrediction(request);
+            success = true;
+            return response;
+        } finally {
+            metrics.recordPrediction(System.nanoTime() - start, success);
+        }
+    }
+
+    private PredictionResponse postPrediction(PredictionRequest request) {
+        // Make a POST request to the Python service's /predict endpoint,
         // sending the patient data and expecting a PredictionResponse back.
-        return restTemplate.postForObject(mlModelUrl, request, PredictionResponse.class);
+        long start = System.nanoTime();
+        boolean success = false;
+        try {
+            PredictionResponse response = restTemplate.postForObject(
+                    mlModelUrl, withTimeoutBudget(request, readTimeoutMs), PredictionResponse.class);
+            success = true;
+            return response;
+        } finally {
+            metrics.recordCall(1, System.nanoTime() - start, success);
+        }
+    }
+
+    private PredictionResponse awaitBatchedPrediction(PredictionRequest request) {
+        // Worst case: batch window, waiting for a pooled connection, connecting and reading
+        long timeoutMs = maxBatchWaitMs + connectionRequestTimeoutMs + connectTimeoutMs + readTimeoutMs;
+        PendingPrediction prediction = new PendingPrediction(
+                request, System.nanoTime() + TimeUnit.MILLISECONDS.toNanos(timeoutMs));
+        pending.add(prediction);
+        try {
+            return prediction.future.get(timeoutMs, TimeUnit.MILLISECONDS);
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            throw new IllegalStateException("Interrupted while waiting for the ML service", e);
+        } catch (ExecutionException e) {
+            if (e.getCause() instanceof RuntimeException cause) {
+                throw cause;
+            }
+            throw new IllegalStateException("ML service call failed", e.getCause());
+        } catch (TimeoutException e) {
+            // Cancelled predictions are skipped if their batch has not been sent yet
+            prediction.future.cancel(false);
+            throw new IllegalStateException("ML service did not respond within " + timeoutMs + " ms", e);
+        }
+    }
+
+    // Collects predictions that arrive within the batch window (or until the
+    // batch is full) and hands each batch to a sender thread.
+    private void dispatchBatches() {
+        while (!Thread.currentThread().isInterrupted()) {
+            try {
+                List<PendingPrediction> batch = new ArrayList<>(maxBatchSize);
+                batch.add(pending.take());
+                long deadline = System.nanoTime() + TimeUnit.MILLISECONDS.toNanos(maxBatchWaitMs);
+                while (batch.size() < maxBatchSize) {
+                    long remaining = deadline - System.nanoTime();
+                    PendingPrediction next = remaining > 0
+                            ? pending.poll(remaining, TimeUnit.NANOSECONDS)
+                            : pending.poll();
+                    if (next == null) {
+                        break;
+                    }
+                    batch.add(next);
+                }
+                batchSenders.execute(() -> sendBatch(batch));
+            } catch (InterruptedException e) {
+                return;
+            }
+        }
+    }
+
+    private void sendBatch(List<PendingPrediction> batch) {
+        long now = System.nanoTime();
+        List<PendingPrediction> live = new ArrayList<>();
+        for (PendingPrediction prediction : batch) {
+            if (prediction.future.isDone()) {
+                continue;
+            }
+            if (prediction.deadlineNanos <= now) {
+                // Waited out its whole budget in the sender queue; don't make the ML service score it
+                prediction.future.completeExceptionally(
+                        new IllegalStateException("Prediction request expired before it was sent"));
+                continue;
+            }
+            live.add(prediction);
+        }
+        if (live.isEmpty()) {
+            return;
+        }
+        List<PredictionRequest> requests = live.stream().map(p -> p.request).toList();
+        // The ML service only needs to finish within the tightest remaining caller budget
+        long earliestDeadline = live.stream().mapToLong(p -> p.deadlineNanos).min().getAsLong();
+        long remainingMs = Math.max(1, TimeUnit.NANOSECONDS.toMillis(earliestDeadline - now));
+
+        long start = System.nanoTime();
+        try {
+            BatchPredictionResponse response = restTemplate.postForObject(
+                    mlBatchUrl, withTimeoutBudget(requests, remainingMs), BatchPredictionResponse.class);
+            if (response == null || response.getResults() == null || response.getResults().size() != live.size()) {
+                throw new IllegalStateException("ML service returned a malformed batch response");
+            }
+            metrics.recordCall(live.size(), System.nanoTime() - start, true);
+            // Records are validated individually, so an invalid form only fails its own caller
+            for (int i = 0; i < live.size(); i++) {
+                BatchPredictionResponse.Result result = response.getResults().get(i);
+                if (result.getStatusCode() == 200 && result.getPrediction() != null) {
+                    live.get(i).future.complete(result.getPrediction());
+                } else {
+                    live.get(i).future.completeExceptionally(new IllegalArgumentException(
+                            "ML service rejected the prediction request (" + result.getStatusCode() + "): "
+                                    + result.getDetail()));
+                }
+            }
+        } catch (RuntimeException e) {
+            metrics.recordCall(live.size(), System.nanoTime() - start, false);
+            live.forEach(p -> p.future.completeExceptionally(e));
+        }
+    }
+
+    // Tell the ML service how long we will wait so it can drop work we have given up on
+    private static <T> HttpEntity<T> withTimeoutBudget(T body, long timeoutMs) {
+        HttpHeaders headers = new HttpHeaders();
+        headers.set("X-Request-Timeout-Ms", String.valueOf(timeoutMs));
+        return new HttpEntity<>(body, headers);
+    }
+
+    private static class PendingPrediction {
+        private final PredictionRequest request;
+        private final long deadlineNanos;
+        private final CompletableFuture<PredictionResponse> future = new CompletableFuture<>();
+
+        PendingPrediction(PredictionRequest request, long deadlineNanos) {
+            this.request = request;
+            this.deadlineNanos = deadlineNanos;
+        }
     }
 }